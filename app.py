@@ -2,160 +2,485 @@ import cv2
 import numpy as np
 import time
 import threading
-import queue
-from hand_detector import HandDetector
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from detector_manager import DetectorManager, DETECTOR_MODES
 from camera_manager import CameraManager
 from display_manager import DisplayManager
 from mouse_controller import MouseController
+from tracing import PipelineTracer, StartupTimer
+from landmark_recording import LandmarkRecorder
+from landmark_ring import LandmarkPublisher
+from motion_gate import MotionGate
+from mailbox import Mailbox
+from calibration import CalibrationSession, ScreenMapping
+from frame_pool import FramePool
+from hand_detector import HandDetectorHelpers
+from inference_worker import InferencePool
+from roi_tracker import RoiTracker
+from inference_scheduler import InferenceScheduler
+from cursor_filter import PredictiveCursor
+from mouse_backends import create_backend
+from performance_profile import PROFILE_DEFAULTS
+from metrics import MetricsServer
 
-# Thread-safe queues for frame passing
-frame_queue = queue.Queue(maxsize=4)  # Raw frames from camera
-processed_queue = queue.Queue(maxsize=4)  # Processed frames with results
+# Frame slots held outside the process threads: one being captured, one in
+# each mailbox, one in the main loop, two in the preview, and one spare
+FRAME_POOL_SIZE = 7
+ROI_SIZE = 128  # Side of the square hand crop used in ROI tracking mode
 
 class HandTrackingApp:
-    def __init__(self):
+    def __init__(self, camera=None, detector=None, display=None, mouse=None, on_cursor=None,
+                 tracer=None, trace_dump=None, inference_workers=0, roi_tracking=False,
+                 target_latency=None, display_fps=8, cursor_rate=120, mouse_backend="pyautogui",
+                 decode_scale=1, headless=False, startup=None, record_landmarks=None,
+                 idle_after=10.0, detector_backend="solutions", frame_budget=0.25,
+                 calibration_path=None, edge_gain=0.5, publish_landmarks=None, profile=None,
+                 metrics=None):
         """Initialize the hand tracking application."""
-        self.camera = CameraManager()
-        # Initialize with lower confidence thresholds for speed
-        self.detector = HandDetector(max_num_hands=2, 
-                                   min_detection_confidence=0.5, 
-                                   min_tracking_confidence=0.5)
-        self.display = DisplayManager()
-        self.mouse = MouseController(smoothing_factor=0.7)  # Increase smoothing
-        self.frame_count = 0  # Shared counter between threads
-        self.display_interval = 3  # Reduced visual updates
-        self.process_interval = 2  # Process every other frame
+        if detector_backend == "tasks" and (inference_workers > 0 or roi_tracking):
+            raise ValueError("The tasks detector backend cannot be combined with "
+                             "inference workers or ROI tracking")
+        self.startup = startup if startup is not None else StartupTimer()
+        self.profile = {**PROFILE_DEFAULTS, **(profile or {})}
+        self.process_size = tuple(self.profile["process_size"])
+        if target_latency is None:
+            target_latency = self.profile["target_latency"]
+        self.display = display if display is not None else self.startup.run(
+            "display", DisplayManager, headless=headless, preview_fps=display_fps)
+        mode = self.display.measure_mode
+        self.inference_workers = inference_workers
+        self.inference = None
+
+        # None of these depend on each other and each can take a while
+        # (device negotiation, model loading, uinput settling, spawning)
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="startup") as pool:
+            camera_future = None if camera is not None else pool.submit(
+                self.startup.run, "camera", CameraManager, self.profile["camera_width"],
+                self.profile["camera_height"], fps=self.profile["camera_fps"])
+            mouse_future = None if mouse is not None else pool.submit(
+                self.startup.run, "mouse", self._create_mouse, mouse_backend)
+            detectors_future = pool.submit(
+                self.startup.run, "detectors", self._create_detectors, detector, mode,
+                detector_backend)
+            inference_future = None if inference_workers <= 0 else pool.submit(
+                self.startup.run, "inference_workers", self._create_inference, mode)
+            self.camera = camera if camera_future is None else camera_future.result()
+            self.mouse = mouse if mouse_future is None else mouse_future.result()
+            self.detectors = detectors_future.result()
+            if inference_future is not None:
+                self.inference = inference_future.result()
+
+        self.on_cursor = on_cursor
+        self.tracer = tracer if tracer is not None else PipelineTracer()
+        self.trace_dump = trace_dump
+        self.show_trace = False  # Toggled with 't'
+        self.frame_count = 0  # Frames handled by the main loop
+        self.hand_frames = 0  # Of those, frames with at least one hand
+        self.scheduler = InferenceScheduler(target_latency=target_latency)
+        self.last_results = None  # Reused on frames the scheduler skips
+        self.cursor_rate = cursor_rate
+        self.cursor = PredictiveCursor(self.mouse.screen_w, self.mouse.screen_h)
         self.running = False
+        self.captured_frames = 0
+        self.frame_budget = frame_budget
+        self.drops = collections.Counter()  # Reason -> frames dropped before use
+        self.drops_lock = threading.Lock()
+        # Items are (slot, trace) and (slot, results, trace); a taker owns the slot
+        self.frames = Mailbox(on_replace=lambda item: self._drop(item[0], "superseded_capture"))
+        self.processed = Mailbox(on_replace=lambda item: self._drop(item[0], "superseded_result"))
+        # Sized for full-resolution frames; reduced decodes use a view of each slot
+        self.frame_pool = FramePool(self.camera.frame_shape(),
+                                    size=FRAME_POOL_SIZE + max(inference_workers, 1))
+        self.decode_scale = decode_scale
+        self.update_decode_scale()
+        # No camera thread yet, so the initial scale is applied here
+        self.camera.set_decode_scale(self.wanted_decode_scale)
+        self.roi_tracker = RoiTracker(
+            roi_size=ROI_SIZE, max_hands=DETECTOR_MODES[mode]["max_num_hands"]) if roi_tracking else None
+        self.last_handled_timestamp = 0.0
+        self.calibration_path = calibration_path
+        self.edge_gain = edge_gain
+        self.calibration = None  # CalibrationSession while 'c' calibration runs
+        if self.mouse.mapping is None:
+            self.mouse.mapping = ScreenMapping.load(calibration_path)
+        self.gate = MotionGate(idle_after=idle_after) if idle_after > 0 else None
+        self.recorder = None
+        if record_landmarks:
+            h, w = self.camera.frame_shape()[:2]
+            self.recorder = LandmarkRecorder(record_landmarks, (w, h))
+        self.publisher = None
+        if publish_landmarks:
+            h, w = self.camera.frame_shape()[:2]
+            self.publisher = LandmarkPublisher((w, h), name=publish_landmarks)
+        self.metrics = MetricsServer(self, metrics) if metrics else None
+
+    def _create_mouse(self, mouse_backend):
+        return MouseController(smoothing_factor=self.profile["smoothing_factor"],
+                               backend=create_backend(mouse_backend))
+
+    def _create_detectors(self, detector, mode, backend):
+        if detector is not None:
+            return DetectorManager(initial=mode, detectors=dict.fromkeys(DETECTOR_MODES, detector))
+        if self.inference_workers > 0:
+            # Workers run detection; the parent only needs the drawing/gesture helpers
+            return DetectorManager(initial=mode,
+                                   detectors=dict.fromkeys(DETECTOR_MODES, HandDetectorHelpers()))
+        return DetectorManager(initial=mode, backend=backend, **self._confidence())
+
+    def _create_inference(self, mode):
+        # Large enough for either the full-frame or the ROI input
+        return InferencePool(self.inference_workers,
+                             frame_shape=(max(self.process_size[1], ROI_SIZE),
+                                          max(self.process_size[0], ROI_SIZE), 3),
+                             max_hands=2, mode=mode, **self._confidence())
+
+    def _confidence(self):
+        return {key: self.profile[key]
+                for key in ("min_detection_confidence", "min_tracking_confidence")}
+
+    @property
+    def dropped_frames(self):
+        """Frames dropped before reaching the main loop's output, for any reason."""
+        return sum(self.drops.values())
+
+    def _drop(self, slot, reason):
+        """Release a frame that will not be used and count why."""
+        if slot is not None:
+            slot.release()
+        with self.drops_lock:
+            self.drops[reason] += 1
+
+    def drops_line(self):
+        with self.drops_lock:
+            reasons = " ".join(f"{k}={v}" for k, v in sorted(self.drops.items()))
+        return f"[Drops] total={self.dropped_frames} {reasons}".rstrip()
+
+    def _expired(self, trace, now=None):
+        """True if the frame is already past its age deadline."""
+        return (self.frame_budget > 0
+                and (time.monotonic() if now is None else now) > trace.deadline)
+
+    def _results_expired(self, results, now=None):
+        """True if results were detected on a frame past its age deadline."""
+        timestamp = getattr(results, "timestamp", None)
+        return (self.frame_budget > 0 and timestamp is not None
+                and (time.monotonic() if now is None else now) > timestamp + self.frame_budget)
+
+    @property
+    def detector(self):
+        """Detector of the current mode; also used for drawing and gesture checks."""
+        return self.detectors.active
         
     def handle_key_press(self):
-        """Handle keyboard input."""
-        key = cv2.waitKey(1) & 0xFF  # Reduced from 10ms to 1ms
-        if key == ord('q'):
+        """Handle keyboard input from the preview window or stdin."""
+        key = self.display.poll_key()
+        if key is None:
+            return True
+        if key == 'q':
             return False
-        elif key == ord('m'):
+        elif key == 'm':
             # Toggle between mouse control and distance measurement
             if self.display.measure_mode == "mouse":
                 self.display.measure_mode = "distance"
-                self.detector = HandDetector(max_num_hands=2)
             else:
                 self.display.measure_mode = "mouse"
-                self.detector = HandDetector(max_num_hands=1)
+            mode = self.display.measure_mode
+            if self.roi_tracker is not None:
+                self.roi_tracker.max_hands = DETECTOR_MODES[mode]["max_num_hands"]
+                self.roi_tracker.reset()
+            if self.inference is not None:
+                self.inference.set_mode(mode)
+            else:
+                # Prewarmed; the process thread swaps it in before its next frame
+                self.detectors.switch(mode)
+        elif key == 't':
+            self.show_trace = not self.show_trace
+        elif key == 'd':
+            self.tracer.dump(self.trace_dump or "trace_dump.json")
+        elif key == 'p':
+            self.display.set_visible(not self.display.visible)
+            self.update_decode_scale()
+        elif key == 'c':
+            if self.calibration is None:
+                self.calibration = CalibrationSession()
+                print(self.calibration.prompt())
+            else:
+                self.calibration = None
+                print("calibration: cancelled")
         return True
 
+    def calibrate(self, finger_pos, now):
+        """Feed the calibration session; install and save the mapping when complete."""
+        session = self.calibration
+        if not session.update(finger_pos, now):
+            return
+        if not session.done:
+            print(session.prompt())
+            return
+        try:
+            mapping = ScreenMapping(session.quad(), edge_gain=self.edge_gain)
+        except ValueError as e:
+            print(f"calibration: {e}; starting over")
+            self.calibration = CalibrationSession()
+            print(self.calibration.prompt())
+            return
+        self.mouse.mapping = mapping
+        print(f"calibration: saved to {mapping.save(self.calibration_path)}")
+        self.calibration = None
+
+    def draw_preview(self, frame, snapshot):
+        """Draw landmarks and overlays for the preview; runs on the renderer thread."""
+        slot, results, finger_pos, fps = snapshot
+        if results and results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                self.detector.draw_landmarks(frame, hand_landmarks)
+            if finger_pos:
+                self.detector.draw_mouse_pointer(frame, *finger_pos)
+        mapping = self.mouse.mapping
+        if mapping is not None:
+            # Outline of the calibrated active region
+            h, w = frame.shape[:2]
+            corners = (mapping.quad * (w, h)).astype(np.int32).reshape(-1, 1, 2)
+            cv2.polylines(frame, [corners], True, (255, 128, 0), 1)
+        calibration = self.calibration
+        if calibration is not None:
+            self.display.draw_trace(frame, [calibration.prompt()])
+        elif self.show_trace:
+            self.display.draw_trace(frame, self.tracer.overlay_lines()
+                                    + [self.scheduler.overlay_line()])
+
+    def update_decode_scale(self):
+        """Decode at full resolution only while the preview is visible.
+
+        Only records the wanted scale: the capture device is not thread-safe,
+        so camera_thread applies it between reads.
+        """
+        self.wanted_decode_scale = 1 if self.display.visible else self.decode_scale
+
     def camera_thread(self):
         """Thread for capturing frames from camera."""
+        applied_scale = self.wanted_decode_scale  # Set in __init__
+        stalled = False
         while self.running:
-            frame = self.camera.capture_frame()
+            scale = self.wanted_decode_scale
+            if scale != applied_scale:
+                self.camera.set_decode_scale(scale)
+                applied_scale = scale
+            slot = self.frame_pool.acquire()
+            if slot is None:
+                # Every buffer is still held downstream. One frame is lost per
+                # stall, not per retry; frame_pool.exhausted counts the retries.
+                if not stalled:
+                    self._drop(None, "pool_exhausted")
+                    stalled = True
+                time.sleep(0.001)
+                continue
+            stalled = False
+            if self.gate is not None and self.gate.idle:
+                # Idle profile: capture, decode and gate only a few frames a second
+                time.sleep(self.gate.idle_period)
+            trace = self.tracer.start()
+            out = self.frame_pool.view(slot, self.camera.frame_shape())
+            frame = self.camera.capture_frame(out=out)
             if frame is not None:
-                if frame_queue.full():
-                    frame_queue.get()  # Remove old frame
-                frame_queue.put((frame.copy(), time.time()))
+                self.captured_frames += 1
+                trace.mark("capture")
+                trace.deadline = trace.timestamp + self.frame_budget
+                if self.captured_frames == 1:
+                    self.startup.mark("first_frame")
+                # Replaces (and releases) a frame no process thread took in time
+                if not self.frames.put((slot, trace)):
+                    slot.release()
+            else:
+                slot.release()
 
     def process_thread(self):
         """Thread for processing frames with MediaPipe."""
+        # Each process thread needs its own resize buffers
+        process_frame = np.empty((self.process_size[1], self.process_size[0], 3), dtype=np.uint8)
+        roi_frame = np.empty((ROI_SIZE, ROI_SIZE, 3), dtype=np.uint8)
         while self.running:
-            try:
-                frame, timestamp = frame_queue.get(timeout=1.0)
-                if frame is not None:
-                    last_results = None
-                    results = None
-                    # Only process every other frame
-                    if self.frame_count % self.process_interval == 0:
-                        # Further reduce resolution for processing
-                        process_frame = cv2.resize(frame, (160, 120))
-                        
-                        # Detect hands
-                        results = self.detector.find_hands(process_frame)
-                        if results and results.multi_hand_landmarks:
-                            last_results = results
-                            if self.frame_count % self.display_interval == 0:
-                                for hand_landmarks in results.multi_hand_landmarks:
-                                    self.detector.draw_landmarks(frame, hand_landmarks)
-                    else:
-                        # Use previous results when skipping processing
-                        try:
-                            prev_frame, prev_results, _ = processed_queue.get_nowait()
-                            if prev_results and prev_results.multi_hand_landmarks:
-                                last_results = prev_results
-                        except queue.Empty:
-                            pass
-                    
-                    results = last_results if last_results else results
-                    
-                    if processed_queue.full():
-                        processed_queue.get()  # Remove old result
-                    processed_queue.put((frame, results, timestamp))
-            except queue.Empty:
+            item = self.frames.get(timeout=1.0)
+            if item is None:
+                continue
+            slot, trace = item
+            trace.mark("frame_mailbox")
+            if self._expired(trace):
+                self._drop(slot, "stale_before_inference")
                 continue
+            frame = slot.frame
+            # Mode switches take effect here, between frames
+            detector = self.detectors.current() if self.inference is None else None
+            if ((self.gate is None or self.gate.allow(frame, trace.timestamp))
+                    and self.scheduler.should_process(trace.timestamp)):
+                detect_start = time.monotonic()
+                if self.roi_tracker is not None:
+                    # Crop around the last known hand, or search the whole frame
+                    detect_frame, roi = self.roi_tracker.prepare(frame, process_frame, roi_frame)
+                else:
+                    # Further reduce resolution for processing
+                    detect_frame = cv2.resize(frame, self.process_size, dst=process_frame)
+                trace.mark("resize")
+
+                # Detect hands
+                if self.inference is not None:
+                    results = self.inference.find_hands(detect_frame)
+                else:
+                    results = detector.find_hands(detect_frame, trace.timestamp)
+                if self.roi_tracker is not None:
+                    results = self.roi_tracker.update(results, roi, frame.shape)
+                detect_end = trace.mark("detect")
+                if results is not None and results.timestamp is None:
+                    results.timestamp = trace.timestamp
+                # Asynchronous backends return the result of an earlier frame
+                detected_at = trace.timestamp if results is None else results.timestamp
+                self.scheduler.observe(results, detect_end - detect_start, detected_at)
+                if self.gate is not None:
+                    self.gate.observe(results, detected_at)
+                self.last_results = results
+            else:
+                # Use previous results when skipping detection
+                results = self.last_results
+
+            # Replaces (and releases) a result the main loop has not taken yet
+            if not self.processed.put((slot, results, trace)):
+                slot.release()
+
+    def cursor_thread(self):
+        """Thread moving the cursor to the predicted position at cursor_rate Hz."""
+        period = 1.0 / self.cursor_rate
+        next_time = time.monotonic()
+        while self.running:
+            position = self.cursor.predict(time.monotonic())
+            if position is not None:
+                self.mouse.move_mouse(*position)
+            next_time += period
+            if self.gate is not None and self.gate.idle:
+                next_time += self.gate.idle_period  # Nothing to move until a hand shows up
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.monotonic()  # Fell behind; don't try to catch up
 
     def run(self):
         """Run the main application loop."""
         self.camera.start()
+        self.display.start(self.draw_preview)
         self.running = True
 
         # Start worker threads
-        camera_thread = threading.Thread(target=self.camera_thread)
-        process_thread = threading.Thread(target=self.process_thread)
+        camera_thread = threading.Thread(target=self.camera_thread, name="camera")
+        process_threads = [threading.Thread(target=self.process_thread, name=f"process-{i}")
+                           for i in range(max(self.inference_workers, 1))]
+        if self.cursor_rate > 0:
+            process_threads.append(threading.Thread(target=self.cursor_thread, name="cursor"))
         camera_thread.start()
-        process_thread.start()
+        for thread in process_threads:
+            thread.start()
+        if self.metrics is not None:
+            self.metrics.start()
+            print(f"Serving metrics at {self.metrics.address}")
         
         try:
-            while True:
-                try:
-                    # Get processed results
-                    frame, results, timestamp = processed_queue.get(timeout=1.0)
-                except queue.Empty:
+            while self.running:
+                # Keys first, so they are handled while frames are being dropped
+                if not self.handle_key_press():
+                    break
+                # Get processed results
+                item = self.processed.get(timeout=0.1)
+                if item is None:
+                    continue
+                slot, results, trace = item
+                frame = slot.frame
+                trace.mark("result_mailbox")
+                if trace.timestamp < self.last_handled_timestamp:
+                    # Overtaken by a newer frame from another inference worker
+                    self._drop(slot, "out_of_order")
+                    continue
+                if self._expired(trace):
+                    # Too old to act on; the next frame is already on its way
+                    self._drop(slot, "stale_before_actuation")
                     continue
+                self.last_handled_timestamp = trace.timestamp
+                if len(getattr(results, "landmarks", ())):
+                    self.hand_frames += 1
+                finger_pos = None
+                if self.recorder is not None:
+                    self.recorder.record(results, trace.timestamp)
+                if self.publisher is not None:
+                    self.publisher.publish(results, trace.timestamp)
+
                 # Handle mouse control if in mouse mode
-                if self.display.measure_mode == "mouse":
-                    right_hand = self.detector.find_right_hand(results)
-                    if right_hand:
-                        finger_pos = self.detector.get_index_finger_pos(right_hand)
-                        if finger_pos:
-                            x, y = finger_pos
-                            
-                            # Move mouse cursor
-                            screen_x, screen_y = self.mouse.map_coordinates(x, y, 
-                                                                        frame.shape[1], 
-                                                                        frame.shape[0])
-                            smooth_x, smooth_y = self.mouse.smooth_position(screen_x, screen_y)
-                            self.mouse.move_mouse(smooth_x, smooth_y)
-                            
-                            # Check for pinch gesture (click/drag)
-                            is_pinched = self.detector.check_pinch(right_hand)
-                            self.mouse.handle_pinch(is_pinched)
-                            
-                            # Check for zoom gestures
-                            is_zoom_in = self.detector.check_zoom_in(right_hand)
-                            is_zoom_out = self.detector.check_zoom_out(right_hand)
-                            self.mouse.handle_zoom(is_zoom_in, is_zoom_out)
-                            
-                            if self.frame_count % self.display_interval == 0:
-                                self.detector.draw_mouse_pointer(frame, x, y)
-                    else:
-                        self.mouse.disable_control()
-
-                # Update display
-                if self.frame_count % self.display_interval == 0:
-                    self.display.draw_mode(frame)
-                    fps = self.display.update_fps()
-                    self.display.draw_fps(frame, fps)
-                    self.display.show_frame(frame)
+                if self.calibration is not None:
+                    # The cursor stays put while the corners are recorded
+                    finger_pos = self.detector.get_index_finger_pos(
+                        self.detector.find_right_hand(results))
+                    self.calibrate(finger_pos, trace.timestamp)
+                elif self.display.measure_mode == "mouse" and self._results_expired(results):
+                    # Reused landmarks past the budget must not move the cursor or fire gestures
+                    self._drop(None, "stale_results")
+                elif self.display.measure_mode == "mouse":
+                    finger_pos = self.mouse.follow_hand(
+                        self.detector, results, frame.shape[1], frame.shape[0],
+                        cursor=self.cursor if self.cursor_rate > 0 else None)
+                    if finger_pos is not None:
+                        if self.startup.mark("first_cursor"):
+                            print(self.startup.report())
+                        if self.on_cursor is not None:
+                            # Reused results were detected on an earlier frame
+                            self.on_cursor(trace.timestamp, results.timestamp)
+                    trace.mark("mouse")
+
+                # Hand the frame to the preview renderer; drawing happens there
+                fps = self.display.update_fps()
+                self.display.submit(slot, results, finger_pos, fps)
+                trace.mark("display")
+                slot.release()
+                self.tracer.finish(trace)
+                if self.tracer.maybe_log():
+                    print(self.scheduler.log_line())
+                    if self.inference is None:
+                        print(self.detectors.log_line())
+                    print(self.mouse.injector.log_line())
+                    if self.gate is not None:
+                        print(self.gate.log_line())
+                    if self.roi_tracker is not None:
+                        print(self.roi_tracker.log_line())
+                    print(self.drops_line())
                 
-                # Increment shared frame counter and handle keyboard input
                 self.frame_count += 1
-                if not self.handle_key_press():
-                    break
 
         finally:
             # Stop threads and cleanup
             self.running = False
             camera_thread.join()
-            process_thread.join()
+            for thread in process_threads:
+                thread.join()
+            for mailbox in (self.frames, self.processed):
+                item = mailbox.close()
+                if item is not None:
+                    item[0].release()
             self.cleanup()
     
+    def stop(self):
+        """Ask the main loop and worker threads to exit."""
+        self.running = False
+
     def cleanup(self):
         """Clean up resources."""
-        self.detector.close()
+        if self.trace_dump:
+            self.tracer.dump(self.trace_dump)
+        self.detectors.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.publisher is not None:
+            self.publisher.close()
+        if self.metrics is not None:
+            self.metrics.close()
+        if self.inference is not None:
+            self.inference.close()
+        self.mouse.close()
         self.camera.stop()
         self.display.cleanup()
@@ -0,0 +1,191 @@
+"""
+Offline landmark extraction from recorded session videos.
+
+Each video is split into chunks of consecutive frames, and the chunks
+are spread over a process pool with one HandDetector (one MediaPipe
+graph) per worker. Every video becomes a landmark recording (see
+landmark_recording.py) with one record per video frame, so record i is
+frame i and its timestamp is the frame's position in the video. The
+output file is sized up front and each worker writes its chunk's
+records straight into its own range of the memory-mapped file, so
+results never go back through the parent:
+
+    python3 batch_extract.py sessions/*.mp4 --out landmarks/ --workers 8
+    python3 batch_extract.py session.mp4 --scaling 1,2,4,8 --max-frames 3000
+
+--scaling runs the same input once per worker count and reports
+frames/s, speedup and parallel efficiency. The recordings load with
+LandmarkRecording and replay with landmark_recording.py.
+"""
+
+import argparse
+import json
+import multiprocessing as mp_proc
+import os
+import time
+import cv2
+import numpy as np
+from landmark_recording import HEADER, HEADER_SIZE, MAGIC, VERSION, pack_record, record_dtype
+from landmarks import PACKED_WIDTH
+
+MAX_HANDS = 2
+
+_detector = None  # This worker's HandDetector
+
+def _init_worker(detector_kwargs):
+    global _detector
+    # Workers already run in parallel; OpenCV's own threads would oversubscribe the cores
+    cv2.setNumThreads(1)
+    from hand_detector import HandDetector
+    _detector = HandDetector(**detector_kwargs)
+
+
+def _extract_chunk(task):
+    """Detect hands on frames [start, end) of a video into its output file."""
+    path, out_path, start, end, fps = task
+    began = time.monotonic()
+    dtype = record_dtype(MAX_HANDS)
+    # Only this chunk's range of the file
+    records = np.memmap(out_path, dtype=dtype, mode="r+",
+                        offset=HEADER_SIZE + start * dtype.itemsize, shape=(end - start,))
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    _detector.reset()  # Chunks are independent; start with full palm detection
+    frames = hands = 0
+    try:
+        for index in range(start, end):
+            ok, frame = cap.read()
+            if not ok:
+                break
+            results = _detector.find_hands(frame)
+            row = records[index - start:index - start + 1]
+            pack_record(row, results, index / fps)
+            frames += 1
+            hands += bool(row["hands"][0])
+        records.flush()
+    finally:
+        cap.release()
+        del records
+    return path, start, frames, hands, time.monotonic() - began
+
+
+def _probe(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video {path}")
+    try:
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    finally:
+        cap.release()
+    if count <= 0:
+        raise ValueError(f"{path} does not report a frame count")
+    return count, fps, size
+
+
+def _create_output(out_path, frames, frame_size):
+    """Write the recording header and size the file for frames zeroed records."""
+    with open(out_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, MAX_HANDS, PACKED_WIDTH, *frame_size)
+                .ljust(HEADER_SIZE, b"\x00"))
+        f.truncate(HEADER_SIZE + frames * record_dtype(MAX_HANDS).itemsize)
+
+
+def run_batch(paths, out_dir, workers, chunk_frames=600, max_frames=None, detector_kwargs=None):
+    """Extract landmarks from every video in paths; returns a report dict."""
+    detector_kwargs = {"max_num_hands": MAX_HANDS, **(detector_kwargs or {})}
+    out_paths = {}
+    for path in paths:
+        out_path = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + ".lmrec")
+        if out_path in out_paths.values():
+            # Both would write their chunks into the same file
+            other = next(p for p, o in out_paths.items() if o == out_path)
+            raise ValueError(f"{other} and {path} would both be written to {out_path}; "
+                             f"rename one or extract them separately")
+        out_paths[path] = out_path
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = []
+    outputs = {}
+    for path, out_path in out_paths.items():
+        count, fps, size = _probe(path)
+        if max_frames:
+            count = min(count, max_frames)
+        _create_output(out_path, count, size)
+        outputs[path] = {"output": out_path, "frames": count, "read": 0, "with_hands": 0}
+        for start in range(0, count, chunk_frames):
+            tasks.append((path, out_path, start, min(start + chunk_frames, count), fps))
+    # Longest chunks first, so a short last chunk does not finish the run alone
+    tasks.sort(key=lambda t: t[3] - t[2], reverse=True)
+
+    began = time.monotonic()
+    ctx = mp_proc.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(detector_kwargs,)) as pool:
+        busy = 0.0
+        for path, start, frames, hands, seconds in pool.imap_unordered(_extract_chunk, tasks):
+            outputs[path]["read"] += frames
+            outputs[path]["with_hands"] += hands
+            busy += seconds
+    elapsed = time.monotonic() - began  # Includes worker startup, as a real batch would
+    frames = sum(o["read"] for o in outputs.values())
+    for path, o in outputs.items():
+        if o["read"] < o["frames"]:
+            print(f"{path}: only {o['read']} of {o['frames']} frames decoded; "
+                  f"the rest have no landmarks")
+    return {
+        "workers": workers,
+        "chunks": len(tasks),
+        "frames": frames,
+        "elapsed_s": round(elapsed, 2),
+        "fps": round(frames / elapsed, 1) if elapsed > 0 else None,
+        "per_worker_fps": round(frames / busy, 1) if busy > 0 else None,
+        "videos": outputs,
+    }
+
+
+def scaling_report(paths, out_dir, worker_counts, **kwargs):
+    """Run the batch once per worker count; adds speedup and efficiency vs the first run."""
+    runs = [run_batch(paths, out_dir, n, **kwargs) for n in worker_counts]
+    base = runs[0]
+    for run in runs:
+        speedup = run["fps"] / base["fps"] if base["fps"] else None
+        run["speedup"] = round(speedup, 2) if speedup else None
+        run["efficiency"] = (round(speedup * base["workers"] / run["workers"], 2)
+                             if speedup else None)
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract hand landmarks from videos in parallel")
+    parser.add_argument("videos", nargs="+", help="video files")
+    parser.add_argument("--out", default="landmarks", help="output directory for .lmrec files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes, one MediaPipe graph each")
+    parser.add_argument("--chunk-frames", type=int, default=600,
+                        help="consecutive frames per task")
+    parser.add_argument("--max-frames", type=int, help="only the first N frames of each video")
+    parser.add_argument("--scaling", metavar="N,N,...",
+                        help="report frames/s for each of these worker counts")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    kwargs = {"chunk_frames": args.chunk_frames, "max_frames": args.max_frames}
+    if args.scaling:
+        counts = [int(n) for n in args.scaling.split(",")]
+        report = scaling_report(args.videos, args.out, counts, **kwargs)
+        print(f"{'workers':>8} {'frames/s':>10} {'speedup':>8} {'efficiency':>10}")
+        for run in report:
+            print(f"{run['workers']:>8} {run['fps']:>10} {run['speedup']:>8} {run['efficiency']:>10}")
+    else:
+        report = run_batch(args.videos, args.out, args.workers, **kwargs)
+        for key, value in report.items():
+            if key != "videos":
+                print(f"{key:>14}: {value}")
+        for path, o in report["videos"].items():
+            print(f"{path} -> {o['output']}: {o['read']} frames, {o['with_hands']} with hands")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+if __name__ == "__main__":
+    main()
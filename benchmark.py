@@ -0,0 +1,261 @@
+"""
+Camera-free end-to-end benchmark for HandTrackingApp.
+
+Drives the real camera_thread -> process_thread -> run pipeline from a
+pluggable frame source at a fixed input rate and reports throughput,
+dropped frames and frame-to-cursor latency percentiles. Latency is
+measured from capture of the frame being handled; landmark age, from
+capture of the frame the landmarks were detected on, is reported
+separately because it also includes the scheduler's back-off while the
+hand is still.
+
+    python3 benchmark.py --source human.jpg --fps 30 --duration 20
+    python3 benchmark.py --source session.mp4 --json result.json --max-p95 80
+
+--typing N instead measures libclicker's typing path in characters per
+second (needs python-uinput; events go to a counting device unless
+--typing-uinput is given).
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import numpy as np
+from app import HandTrackingApp
+from camera_manager import CameraManager
+from display_manager import DisplayManager
+from frame_sources import V4L2Source, open_source
+from mouse_controller import MouseController
+from performance_profile import PROFILE_DEFAULTS
+
+class RecordingBackend:
+    """Input backend that counts injected events instead of performing them."""
+
+    def __init__(self, screen_w=1920, screen_h=1080):
+        self.size = (screen_w, screen_h)
+        self.events = {}
+
+    def screen_size(self):
+        return self.size
+
+    def _record(self, name):
+        self.events[name] = self.events.get(name, 0) + 1
+
+    def move_to(self, x, y):
+        self._record("move_to")
+
+    def mouse_down(self):
+        self._record("mouse_down")
+
+    def mouse_up(self):
+        self._record("mouse_up")
+
+    def click(self):
+        self._record("click")
+
+    def hotkey(self, *keys):
+        self._record("hotkey")
+
+    def type_text(self, text):
+        self._record("type_text")
+
+    def close(self):
+        pass
+
+
+class CountingKeyboard:
+    """Stand-in for libclicker's uinput keyboard that counts events and SYN frames."""
+
+    def __init__(self):
+        self.events = 0
+        self.frames = 0
+
+    def emit(self, event, value, syn=True):
+        self.events += 1
+        self.frames += syn
+
+    def syn(self):
+        self.frames += 1
+
+
+def run_benchmark(source_spec, fps, duration, warmup, **app_kwargs):
+    """Run the pipeline for warmup + duration seconds and return a report dict.
+
+    Extra keyword arguments are passed to HandTrackingApp. A profile
+    argument also sets the camera size and rate of a live source.
+    """
+    latencies = []
+    ages = []  # Includes detection skipped by the scheduler
+    measuring = threading.Event()
+
+    def on_cursor(captured_at, detected_at):
+        if measuring.is_set():
+            now = time.monotonic()
+            latencies.append(now - captured_at)
+            ages.append(now - detected_at)
+
+    profile = {**PROFILE_DEFAULTS, **(app_kwargs.get("profile") or {})}
+    source = open_source(source_spec, fps=fps)
+    if isinstance(source, V4L2Source):
+        source.width, source.height = profile["camera_width"], profile["camera_height"]
+        source.camera_fps = profile["camera_fps"]
+    app = HandTrackingApp(camera=CameraManager(source=source),
+                          display=DisplayManager(headless=True, stdin_keys=False),
+                          mouse=MouseController(smoothing_factor=profile["smoothing_factor"],
+                                                backend=RecordingBackend()),
+                          on_cursor=on_cursor, **app_kwargs)
+
+    counters = {}
+
+    def measure():
+        time.sleep(warmup)
+        counters["start"] = (time.monotonic(), app.captured_frames,
+                             app.frame_count, app.dropped_frames)
+        measuring.set()
+        time.sleep(duration)
+        measuring.clear()
+        counters["end"] = (time.monotonic(), app.captured_frames,
+                           app.frame_count, app.dropped_frames)
+        app.stop()
+
+    timer = threading.Thread(target=measure, daemon=True)
+    timer.start()
+    app.run()
+    timer.join()
+
+    t0, captured0, handled0, dropped0 = counters["start"]
+    t1, captured1, handled1, dropped1 = counters["end"]
+    elapsed = t1 - t0
+    captured = captured1 - captured0
+    handled = handled1 - handled0
+    report = {
+        "source": source_spec,
+        "input_fps": fps,
+        "duration_s": round(elapsed, 3),
+        "captured_frames": captured,
+        "handled_frames": handled,
+        "pipeline_drops": dropped1 - dropped0,
+        "dropped_frames": max(captured - handled, 0),
+        "capture_fps": round(captured / elapsed, 2),
+        "throughput_fps": round(handled / elapsed, 2),
+        "cursor_commands": len(latencies),
+        # Share of handled frames on which the pointing hand was found
+        "detection_rate": round(len(latencies) / handled, 3) if handled else 0.0,
+    }
+    for name, values in (("latency", latencies), ("landmark_age", ages)):
+        if values:
+            ms = np.array(values) * 1000.0
+            for p in (50, 95, 99):
+                report[f"{name}_p{p}_ms"] = round(float(np.percentile(ms, p)), 2)
+            report[f"{name}_max_ms"] = round(float(ms.max()), 2)
+    report["injector"] = app.mouse.injector.stats()
+    report["stages"] = app.tracer.summary()
+    report["drops"] = dict(app.drops)
+    report["scheduler"] = app.scheduler.stats()
+    report["startup"] = app.startup.summary()
+    if app.gate is not None:
+        report["power"] = app.gate.stats()
+    if app.roi_tracker is not None:
+        report["roi"] = app.roi_tracker.stats()
+    return report
+
+
+def run_typing_benchmark(chars, rate=None, uinput_device=False):
+    """Time libclicker.type_text on chars characters of mixed text.
+
+    Also times the same text sent one press_key() call per character for
+    comparison. Returns a report dict.
+    """
+    import libclicker
+    sample = "The quick brown fox jumps over the lazy dog, 1234567890! {Hello}\n"
+    text = (sample * (chars // len(sample) + 1))[:chars]
+    if uinput_device:
+        libclicker.init()
+        device = None
+    else:
+        device = libclicker._keyboard = CountingKeyboard()
+
+    report = {"chars": chars, "rate_limit": rate}
+    for name, type_all in (("type_text", lambda: libclicker.type_text(text, rate)),
+                           ("press_key", lambda: [libclicker.press_key(c) for c in text])):
+        if device is not None:
+            device.events = device.frames = 0
+        start = time.perf_counter()
+        type_all()
+        elapsed = time.perf_counter() - start
+        report[f"{name}_chars_per_s"] = round(chars / elapsed, 1)
+        if device is not None:
+            report[f"{name}_events"] = device.events
+            report[f"{name}_frames"] = device.frames
+        if rate:
+            break  # press_key has no rate limit to compare against
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--source", default="human.jpg",
+                        help="synthetic, /dev/videoN, a video file, or an image path/glob")
+    parser.add_argument("--fps", type=float, default=30, help="fixed input frame rate")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds ignored at start")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--max-p95", type=float,
+                        help="exit non-zero if p95 latency exceeds this many ms")
+    parser.add_argument("--inference-workers", type=int, default=0)
+    parser.add_argument("--roi-tracking", action="store_true")
+    parser.add_argument("--decode-scale", type=int, choices=[1, 2, 4, 8], default=1)
+    parser.add_argument("--idle-after", type=float, default=10.0)
+    parser.add_argument("--detector-backend", choices=["solutions", "tasks"], default="solutions")
+    parser.add_argument("--frame-budget", type=float, default=0.25)
+    parser.add_argument("--typing", type=int, metavar="N",
+                        help="benchmark typing N characters instead of the pipeline")
+    parser.add_argument("--typing-rate", type=float, help="type_text rate limit, chars/s")
+    parser.add_argument("--typing-uinput", action="store_true",
+                        help="type into a real uinput keyboard (types into the focused window)")
+    args = parser.parse_args()
+
+    if args.typing:
+        report = run_typing_benchmark(args.typing, args.typing_rate, args.typing_uinput)
+        for key, value in report.items():
+            print(f"{key:>24}: {value}")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+        return 0
+
+    report = run_benchmark(args.source, args.fps, args.duration, args.warmup,
+                           inference_workers=args.inference_workers,
+                           roi_tracking=args.roi_tracking,
+                           decode_scale=args.decode_scale,
+                           idle_after=args.idle_after,
+                           detector_backend=args.detector_backend,
+                           frame_budget=args.frame_budget)
+    for key, value in report.items():
+        if key not in ("stages", "injector", "startup", "power", "roi", "drops", "scheduler"):
+            print(f"{key:>19}: {value}")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:>19}: p50 {stats['p50_ms']} / p95 {stats['p95_ms']} / p99 {stats['p99_ms']} ms")
+    print(f"{'injector':>19}: {report['injector']}")
+    print(f"{'drops':>19}: {report['drops']}")
+    for key in ("power", "roi"):
+        if key in report:
+            print(f"{key:>19}: {report[key]}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.max_p95 is not None:
+        p95 = report.get("latency_p95_ms")
+        if p95 is None:
+            print("No cursor commands were issued; is there a hand in the input?")
+            return 1
+        if p95 > args.max_p95:
+            print(f"p95 latency {p95} ms exceeds budget {args.max_p95} ms")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
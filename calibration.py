@@ -0,0 +1,146 @@
+import json
+import os
+import time
+import cv2
+import numpy as np
+from user_config import config_path
+
+CORNERS = ("top-left", "top-right", "bottom-right", "bottom-left")
+
+def default_path():
+    """Per-installation calibration file."""
+    return config_path("calibration.json")
+
+
+class ScreenMapping:
+    """Camera-space active region -> screen mapping, precomputed into a LUT.
+
+    quad holds the normalized camera coordinates of the region's four
+    corners, in CORNERS order. A perspective homography maps it onto the
+    unit square; edge_gain > 0 then bends each axis so motion is finer in
+    the middle and faster towards the edges while the corners stay put.
+    The composite is sampled once on a lut_size grid over the camera
+    frame, and map() bilinearly interpolates that table, so per-frame cost
+    is a handful of array lookups whatever the mapping is. Results are
+    normalized screen coordinates clipped to [0, 1].
+    """
+
+    def __init__(self, quad, edge_gain=0.0, lut_size=256):
+        self.quad = np.asarray(quad, dtype=np.float32).reshape(4, 2)
+        self.edge_gain = float(edge_gain)
+        self.lut_size = lut_size
+        unit = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float32)
+        self.homography = cv2.getPerspectiveTransform(self.quad, unit)
+        grid = np.linspace(0.0, 1.0, lut_size, dtype=np.float32)
+        gx, gy = np.meshgrid(grid, grid)
+        points = np.stack([gx.ravel(), gy.ravel()], axis=1).reshape(-1, 1, 2)
+        mapped = cv2.perspectiveTransform(points, self.homography).reshape(lut_size, lut_size, 2)
+        self.lut = np.clip(self._accelerate(mapped), 0.0, 1.0).astype(np.float32)
+
+    def _accelerate(self, uv):
+        if self.edge_gain <= 0:
+            return uv
+        # Odd cubic on [-1, 1]: slope 1/(1+g) at the centre, (1+3g)/(1+g) at the edges
+        c = np.clip(uv * 2.0 - 1.0, -1.0, 1.0)
+        return (c * (1.0 + self.edge_gain * c * c) / (1.0 + self.edge_gain) + 1.0) / 2.0
+
+    def map(self, x, y):
+        """Normalized camera (x, y) -> normalized screen (x, y); scalars or arrays."""
+        n = self.lut_size - 1
+        fx = np.clip(np.asarray(x, dtype=np.float32) * n, 0, n)
+        fy = np.clip(np.asarray(y, dtype=np.float32) * n, 0, n)
+        x0 = np.minimum(fx.astype(np.intp), n - 1)
+        y0 = np.minimum(fy.astype(np.intp), n - 1)
+        wx = (fx - x0)[..., None]
+        wy = (fy - y0)[..., None]
+        top = self.lut[y0, x0] * (1 - wx) + self.lut[y0, x0 + 1] * wx
+        bottom = self.lut[y0 + 1, x0] * (1 - wx) + self.lut[y0 + 1, x0 + 1] * wx
+        uv = top * (1 - wy) + bottom * wy
+        return uv[..., 0], uv[..., 1]
+
+    def save(self, path=None):
+        path = path or default_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"quad": self.quad.tolist(), "edge_gain": self.edge_gain,
+                       "lut_size": self.lut_size, "saved_at": time.time()}, f, indent=2)
+            f.write("\n")
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        """Load a saved calibration, or None if there is none or it cannot be read."""
+        path = path or default_path()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return cls(data["quad"], data.get("edge_gain", 0.0), data.get("lut_size", 256))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError, cv2.error) as e:
+            # JSONDecodeError is a ValueError, as is a quad that is not usable
+            print(f"Ignoring unreadable calibration {path} ({e}); press 'c' to calibrate again")
+            return None
+
+
+class CalibrationSession:
+    """Collects the active region's corners from the index fingertip.
+
+    The user holds the fingertip still at each corner of a comfortable
+    region in CORNERS order; a corner is taken once the tip has stayed
+    within tolerance (normalized units) for dwell seconds, as the mean of
+    those samples. The tip must then move away before the next corner
+    can be taken. After the fourth corner, quad() returns the region or
+    raises ValueError if it is not a usable convex quadrilateral.
+    """
+
+    def __init__(self, dwell=1.0, tolerance=0.02, min_area=0.02):
+        self.dwell = dwell
+        self.tolerance = tolerance
+        self.min_area = min_area
+        self.corners = []
+        self.samples = []  # (t, x, y) since the tip settled
+        self.armed = True  # False until the tip leaves the last captured corner
+
+    @property
+    def done(self):
+        return len(self.corners) == len(CORNERS)
+
+    def prompt(self):
+        if self.done:
+            return "calibration: done"
+        return (f"calibration: hold fingertip at the {CORNERS[len(self.corners)]} "
+                f"corner ({len(self.corners) + 1}/{len(CORNERS)})")
+
+    def update(self, finger_pos, now):
+        """Feed one fingertip position (or None); returns True when a corner was taken."""
+        if self.done:
+            return False
+        if finger_pos is None:
+            self.samples = []
+            return False
+        x, y = finger_pos
+        if not self.armed:
+            last = self.corners[-1]
+            if np.hypot(x - last[0], y - last[1]) > 3 * self.tolerance:
+                self.armed = True
+            return False
+        if self.samples:
+            _, x0, y0 = self.samples[0]
+            if np.hypot(x - x0, y - y0) > self.tolerance:
+                self.samples = []
+        self.samples.append((now, x, y))
+        if now - self.samples[0][0] < self.dwell:
+            return False
+        points = np.array([(sx, sy) for _, sx, sy in self.samples])
+        self.corners.append(tuple(points.mean(axis=0)))
+        self.samples = []
+        self.armed = False
+        return True
+
+    def quad(self):
+        quad = np.array(self.corners, dtype=np.float32)
+        if (not cv2.isContourConvex(quad.reshape(-1, 1, 2))
+                or cv2.contourArea(quad) < self.min_area):
+            raise ValueError("Calibration corners do not form a large enough convex region")
+        return quad
@@ -1,35 +1,38 @@
 import cv2
+from frame_sources import V4L2Source
 
 class CameraManager:
-    def __init__(self, width=640, height=480):
-        """Initialize the camera with specified resolution."""
-        self.cap = cv2.VideoCapture("/dev/video0", cv2.CAP_V4L2)
+    def __init__(self, width=640, height=480, source=None, fps=24):
+        """Initialize the camera with specified resolution and rate or a custom frame source."""
+        self.source = source if source is not None else V4L2Source(width=width, height=height,
+                                                                   fps=fps)
         self.setup_camera(width, height)
 
     def setup_camera(self, width, height):
         """Configure camera settings."""
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
-        self.cap.set(cv2.CAP_PROP_FPS, 24)  # Request 60fps
-        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Minimize buffer size
-        
-        if not self.cap.isOpened():
+        self.source.open()
+
+        if not self.source.is_opened():
             raise RuntimeError("Could not open camera")
 
     def start(self):
         """Start the camera."""
-        # OpenCV camera is already started in __init__
+        # Frame source is already opened in __init__
         pass
 
-    def capture_frame(self):
-        """Capture a single frame from the camera."""
-        ret, frame = self.cap.read()
-        if not ret:
-            return None
-        return cv2.flip(frame, 0)  # Flip frame vertically as in camera_stream.py
+    def frame_shape(self):
+        """Shape of captured frames, for sizing preallocated buffers."""
+        return self.source.frame_shape()
+
+    def set_decode_scale(self, scale):
+        """Decode frames at 1/scale resolution where the source supports it."""
+        return self.source.set_decode_scale(scale)
+
+    def capture_frame(self, out=None):
+        """Capture a single frame from the camera, into out if given."""
+        return self.source.read(out)
 
     def stop(self):
         """Stop the camera."""
-        self.cap.release()
+        self.source.release()
         cv2.destroyAllWindows()
@@ -0,0 +1,93 @@
+import math
+import threading
+import numpy as np
+
+class OneEuroFilter:
+    """One Euro filter for one axis (Casiez et al., CHI 2012).
+
+    Heavy smoothing when the signal is slow, little when it is fast: the
+    cutoff frequency rises with the filtered speed, trading jitter for lag
+    automatically instead of through a fixed smoothing factor.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x = None
+        self.dx = 0.0
+        self.t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, t):
+        if self.x is None or t <= self.t:
+            if self.x is None:
+                self.x = x
+            self.t = t
+            return self.x
+        dt = t - self.t
+        dx = (x - self.x) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.dx = self.dx + a_d * (dx - self.dx)
+        cutoff = self.min_cutoff + self.beta * abs(self.dx)
+        a = self._alpha(cutoff, dt)
+        self.x = self.x + a * (x - self.x)
+        self.t = t
+        return self.x
+
+    def reset(self):
+        self.x = None
+        self.dx = 0.0
+        self.t = None
+
+
+class PredictiveCursor:
+    """One Euro filtered cursor position that extrapolates to 'now'.
+
+    update() is called with each landmark-derived screen position and the
+    capture time of its frame. predict() returns where the finger most
+    likely is at the given time: the filtered position moved along the
+    filtered velocity by the time elapsed since capture, which is exactly
+    the pipeline latency plus the time since the last update. The horizon
+    is capped so a lost hand does not send the cursor flying, and output
+    stops once no update has arrived for stale_after seconds.
+    """
+
+    def __init__(self, screen_w, screen_h, min_cutoff=1.0, beta=0.01, d_cutoff=1.0,
+                 max_horizon=0.1, stale_after=0.25):
+        self.screen_w = screen_w
+        self.screen_h = screen_h
+        self.max_horizon = max_horizon
+        self.stale_after = stale_after
+        self.fx = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.fy = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.lock = threading.Lock()
+        self.timestamp = None
+
+    def update(self, x, y, timestamp):
+        """Feed a measured screen position captured at timestamp (monotonic)."""
+        with self.lock:
+            if self.timestamp is not None and timestamp <= self.timestamp:
+                return  # Same detection seen again on a skipped frame
+            if self.timestamp is not None and timestamp - self.timestamp > self.stale_after:
+                # Hand was lost in between; old velocity means nothing now
+                self.fx.reset()
+                self.fy.reset()
+            self.fx(x, timestamp)
+            self.fy(y, timestamp)
+            self.timestamp = timestamp
+
+    def predict(self, now):
+        """Return the extrapolated (x, y) at time now, or None when there is nothing fresh."""
+        with self.lock:
+            if self.timestamp is None or now - self.timestamp > self.stale_after:
+                return None
+            horizon = min(max(now - self.timestamp, 0.0), self.max_horizon)
+            x = self.fx.x + self.fx.dx * horizon
+            y = self.fy.x + self.fy.dx * horizon
+        return (int(np.clip(x, 0, self.screen_w - 1)),
+                int(np.clip(y, 0, self.screen_h - 1)))
@@ -0,0 +1,91 @@
+import threading
+import time
+import numpy as np
+from hand_detector import HandDetector, TasksHandDetector
+
+# Backend name -> detector class; "tasks" is asynchronous (LIVE_STREAM)
+DETECTOR_BACKENDS = {"solutions": HandDetector, "tasks": TasksHandDetector}
+
+# Mode name -> HandDetector settings that differ between modes
+DETECTOR_MODES = {
+    "mouse": {"max_num_hands": 1},
+    "distance": {"max_num_hands": 2},
+}
+
+class DetectorManager:
+    """One prewarmed HandDetector per mode, switched between frames.
+
+    Building a MediaPipe graph takes long enough to stall the preview, so
+    every mode's detector is built and run once on a blank frame up front.
+    switch() only records the requested mode; the thread that runs
+    detection picks it up in current() at the start of its next frame, so
+    a graph is never swapped out from under a frame in flight. All
+    detectors are closed together in close().
+    """
+
+    def __init__(self, modes=None, initial="mouse", prewarm_shape=(120, 160, 3),
+                 detectors=None, backend="solutions", **detector_kwargs):
+        if backend not in DETECTOR_BACKENDS:
+            raise ValueError(f"Unknown detector backend {backend!r}; "
+                             f"choose from {', '.join(DETECTOR_BACKENDS)}")
+        self.modes = dict(DETECTOR_MODES if modes is None else modes)
+        if initial not in self.modes:
+            raise ValueError(f"Unknown detector mode {initial!r}; choose from {', '.join(self.modes)}")
+        self.lock = threading.Lock()
+        if detectors is not None:
+            self.detectors = dict(detectors)
+        else:
+            self.detectors = {}
+            blank = np.zeros(prewarm_shape, dtype=np.uint8) if prewarm_shape else None
+            for mode, settings in self.modes.items():
+                detector = DETECTOR_BACKENDS[backend](**{**detector_kwargs, **settings})
+                if blank is not None:
+                    # Loads the models and allocates the graph; no reset() afterwards,
+                    # which would restart the graph and throw the warm-up away
+                    detector.find_hands(blank)
+                self.detectors[mode] = detector
+        self.mode = initial
+        self.active = self.detectors[initial]
+        self.pending = None  # (mode, requested at)
+        self.switches = 0
+        self.last_switch_ms = None  # Request-to-first-use delay of the last switch
+
+    def switch(self, mode):
+        """Request mode; takes effect at the next frame boundary."""
+        if mode not in self.detectors:
+            raise ValueError(f"Unknown detector mode {mode!r}; choose from {', '.join(self.detectors)}")
+        with self.lock:
+            self.pending = (mode, time.monotonic())
+
+    def current(self):
+        """Detector to use for the frame about to be processed."""
+        with self.lock:
+            if self.pending is not None:
+                mode, requested_at = self.pending
+                self.pending = None
+                if mode != self.mode:
+                    # Not reset: stale tracking fails over to palm detection by itself
+                    detector = self.detectors[mode]
+                    self.mode = mode
+                    self.active = detector
+                    self.switches += 1
+                    self.last_switch_ms = round((time.monotonic() - requested_at) * 1000, 2)
+            return self.active
+
+    def log_line(self):
+        with self.lock:
+            last = "-" if self.last_switch_ms is None else f"{self.last_switch_ms}ms"
+            line = f"[Detectors] mode={self.mode} switches={self.switches} last_switch={last}"
+            if hasattr(self.active, "stats"):
+                # Asynchronous backend: how many submitted frames it kept up with
+                line += " " + " ".join(f"{k}={v}" for k, v in self.active.stats().items())
+            return line
+
+    def close(self):
+        """Release the native resources of every detector."""
+        closed = set()
+        for detector in self.detectors.values():
+            if id(detector) not in closed:
+                closed.add(id(detector))
+                detector.close()
+        self.detectors = {}
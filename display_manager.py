@@ -1,13 +1,35 @@
 import cv2
+import queue
+import sys
+import threading
 import time
 
 class DisplayManager:
-    def __init__(self, fps_buffer_size=10):
-        """Initialize display manager with FPS calculation settings."""
+    def __init__(self, fps_buffer_size=10, headless=False, preview_fps=8, stdin_keys=True,
+                 window_name="Hand Tracking"):
+        """Initialize display manager with FPS calculation settings.
+
+        The preview is drawn and shown by its own thread at no more than
+        preview_fps, from the latest snapshot passed to submit(), so
+        drawing never delays the frame loop. In headless mode no window
+        is created and nothing is drawn. Key presses come from the
+        preview window and, if stdin_keys is set, from stdin lines.
+        """
         self.prev_time = time.time()
         self.fps_values = []
         self.fps_buffer_size = fps_buffer_size
         self.measure_mode = "mouse"  # mouse or distance
+        self.headless = headless
+        self.visible = not headless  # Preview window is shown
+        self.preview_period = 1.0 / preview_fps
+        self.window_name = window_name
+        self.window_open = False
+        self.keys = queue.Queue()
+        self.draw_callback = None  # draw_callback(frame, snapshot) adds app overlays
+        self.snapshot = None  # Latest (slot, results, finger_pos, fps), replaced on submit
+        self.snapshot_lock = threading.Lock()
+        self.running = False
+        self.render_thread = None
         
         # Pre-initialize font settings
         self.font = cv2.FONT_HERSHEY_SIMPLEX
@@ -15,14 +37,108 @@ class DisplayManager:
         self.text_thickness = 2
         self.line_thickness = 2
         
-        # Create window with optimized properties
-        cv2.namedWindow("Hand Tracking", cv2.WINDOW_NORMAL)
-        cv2.setWindowProperty("Hand Tracking", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
-        
         # Cache text positions
         self.fps_pos = (10, 30)
         self.distance_pos = (10, 70)
         self.mode_pos = (10, 110)
+        self.trace_pos = (10, 150)
+        self.trace_line_height = 22
+
+        if stdin_keys:
+            threading.Thread(target=self._stdin_loop, name="stdin-keys", daemon=True).start()
+
+    def start(self, draw_callback=None):
+        """Start the preview renderer thread (no-op when headless)."""
+        self.draw_callback = draw_callback
+        if self.headless:
+            return
+        self.running = True
+        self.render_thread = threading.Thread(target=self._render_loop, name="preview")
+        self.render_thread.start()
+
+    def submit(self, slot, results, finger_pos, fps):
+        """Offer the latest frame to the renderer; an undrawn older one is dropped.
+
+        Takes its own reference on slot, so the caller still releases its own.
+        """
+        if not self.visible:
+            return
+        slot.retain()
+        with self.snapshot_lock:
+            old, self.snapshot = self.snapshot, (slot, results, finger_pos, fps)
+        if old is not None:
+            old[0].release()
+
+    def _take_snapshot(self):
+        with self.snapshot_lock:
+            snapshot, self.snapshot = self.snapshot, None
+        return snapshot
+
+    def _render_loop(self):
+        """Draw and show the latest snapshot at the capped preview rate."""
+        next_time = time.monotonic()
+        while self.running:
+            if self.visible and not self.window_open:
+                cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+                cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
+                self.window_open = True
+            elif not self.visible and self.window_open:
+                cv2.destroyWindow(self.window_name)
+                self.window_open = False
+
+            snapshot = self._take_snapshot()
+            if snapshot is not None:
+                slot, results, finger_pos, fps = snapshot
+                try:
+                    frame = slot.frame
+                    if self.draw_callback is not None:
+                        self.draw_callback(frame, snapshot)
+                    self.draw_mode(frame)
+                    self.draw_fps(frame, fps)
+                    self.show_frame(frame)
+                finally:
+                    slot.release()
+
+            if self.window_open:
+                key = cv2.waitKey(1) & 0xFF
+                if key != 0xFF:
+                    self.keys.put(chr(key))
+            next_time += self.preview_period
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.monotonic()
+
+        if self.window_open:
+            cv2.destroyWindow(self.window_name)
+            self.window_open = False
+
+    def _stdin_loop(self):
+        """Feed characters typed on stdin (one command per line) into the key queue."""
+        try:
+            for line in sys.stdin:
+                for char in line.strip():
+                    self.keys.put(char)
+        except (OSError, ValueError):
+            pass  # No usable stdin, e.g. started by a service manager
+
+    def poll_key(self):
+        """Return the next pending key as a one-character string, or None."""
+        try:
+            return self.keys.get_nowait()
+        except queue.Empty:
+            return None
+
+    def set_visible(self, visible):
+        """Show or hide the preview window; ignored when headless."""
+        if self.headless:
+            return
+        self.visible = visible
+        if not visible:
+            snapshot = self._take_snapshot()
+            if snapshot is not None:
+                snapshot[0].release()
 
     def update_fps(self):
         """Calculate and update FPS."""
@@ -58,10 +174,25 @@ class DisplayManager:
         cv2.putText(frame, f'Mode: {mode_text}', self.mode_pos,
                    self.font, self.font_scale, (255, 0, 0), self.text_thickness)
 
-    def show_frame(self, frame, window_name="Hand Tracking"):
+    def draw_trace(self, frame, lines):
+        """Draw per-stage latency lines (p50/p95/p99) on frame."""
+        x, y = self.trace_pos
+        for line in lines:
+            cv2.putText(frame, line, (x, y), self.font, self.font_scale * 0.7,
+                       (0, 255, 255), 1)
+            y += self.trace_line_height
+
+    def show_frame(self, frame, window_name=None):
         """Display the frame."""
-        cv2.imshow(window_name, frame)
+        cv2.imshow(window_name or self.window_name, frame)
 
     def cleanup(self):
         """Clean up display resources."""
-        cv2.destroyAllWindows()
+        self.running = False
+        if self.render_thread is not None:
+            self.render_thread.join()
+        snapshot = self._take_snapshot()
+        if snapshot is not None:
+            snapshot[0].release()
+        if not self.headless:
+            cv2.destroyAllWindows()
@@ -0,0 +1,79 @@
+import threading
+import numpy as np
+
+class FrameSlot:
+    """One preallocated frame buffer with a reference count.
+
+    frame is the view of array holding the current image, which is smaller
+    than the buffer when the camera decodes at reduced scale. The slot
+    returns to its pool when the last holder calls release().
+    """
+    __slots__ = ("pool", "index", "array", "frame", "refs")
+
+    def __init__(self, pool, index, array):
+        self.pool = pool
+        self.index = index
+        self.array = array
+        self.frame = array
+        self.refs = 0
+
+    def retain(self):
+        """Add a holder, e.g. before handing the slot to a second consumer."""
+        with self.pool.lock:
+            self.refs += 1
+        return self
+
+    def release(self):
+        """Drop a holder; the slot becomes free again when none are left."""
+        self.pool._release(self)
+
+
+class FramePool:
+    """Fixed set of preallocated NumPy frame buffers shared by the threads.
+
+    Capture reads straight into a free slot, and the slot is then passed
+    through the mailboxes by reference, so steady-state frame memory is
+    bounded by size * height * width * channels bytes and no frame is
+    allocated per capture.
+    """
+
+    def __init__(self, shape, size=12, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.lock = threading.Lock()
+        self.slots = [FrameSlot(self, i, np.zeros(self.shape, dtype=dtype))
+                      for i in range(size)]
+        self.free = list(reversed(self.slots))
+        self.exhausted = 0  # acquire() calls that found no free slot
+
+    def acquire(self):
+        """Take a free slot with one reference, or None if all are in use."""
+        with self.lock:
+            if not self.free:
+                self.exhausted += 1
+                return None
+            slot = self.free.pop()
+            slot.refs = 1
+            slot.frame = slot.array
+            return slot
+
+    def _release(self, slot):
+        with self.lock:
+            if slot.refs <= 0:
+                raise RuntimeError(f"Frame slot {slot.index} released more than once")
+            slot.refs -= 1
+            if slot.refs == 0:
+                self.free.append(slot)
+
+    def view(self, slot, shape):
+        """Point slot.frame at the top-left shape[0] x shape[1] region of its buffer."""
+        slot.frame = slot.array[:shape[0], :shape[1]]
+        return slot.frame
+
+    def in_use(self):
+        """Number of slots currently held by some thread."""
+        with self.lock:
+            return len(self.slots) - len(self.free)
+
+    def nbytes(self):
+        """Total bytes reserved for frame buffers."""
+        return sum(slot.array.nbytes for slot in self.slots)
@@ -0,0 +1,297 @@
+import glob
+import os
+import time
+import cv2
+import numpy as np
+
+# JPEG DCT-domain downscaling: decode straight to 1/2, 1/4 or 1/8 size
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+def _scaled(size, scale):
+    # libjpeg rounds scaled dimensions up
+    return -(-size // scale)
+
+class FrameSource:
+    """Base class for anything CameraManager can pull frames from.
+
+    Subclasses implement open(), frame_shape(), _read(out) and release().
+    When fps is set, read() paces delivery to that fixed rate so file and
+    synthetic inputs behave like a live camera. When out is given, the
+    frame is decoded and flipped into that buffer without allocating.
+
+    Sources that deliver JPEG data can also decode at a reduced scale
+    (see set_decode_scale()), which changes frame_shape() accordingly.
+    """
+    supports_reduced_decode = False
+
+    def __init__(self, fps=None, flip=False):
+        self.fps = fps
+        self.flip = flip
+        self.frames_read = 0
+        self.decode_scale = 1
+        self._next_deadline = None
+
+    def set_decode_scale(self, scale):
+        """Decode at 1/scale resolution (1, 2, 4 or 8); return the scale in effect."""
+        if scale not in REDUCED_DECODE_FLAGS:
+            raise ValueError(f"decode scale must be one of {sorted(REDUCED_DECODE_FLAGS)}")
+        if self.supports_reduced_decode:
+            self.decode_scale = scale
+        return self.decode_scale
+
+    def open(self):
+        """Open the underlying device or file."""
+        pass
+
+    def is_opened(self):
+        """Check whether the source can deliver frames."""
+        return True
+
+    def frame_shape(self):
+        """(height, width, channels) of the frames read() will return."""
+        raise NotImplementedError
+
+    def read(self, out=None):
+        """Return the next frame, or None when nothing is available."""
+        if self.fps:
+            self._wait_for_deadline()
+        frame = self._read(out)
+        if frame is None:
+            return None
+        if out is not None and frame is not out:
+            # Backend could not decode in place (reduced JPEG decode, or size changed mid-stream)
+            frame = cv2.resize(frame, (out.shape[1], out.shape[0]), dst=out)
+        self.frames_read += 1
+        if self.flip:
+            frame = cv2.flip(frame, 0, dst=frame if out is not None else None)
+        return frame
+
+    def _read(self, out):
+        raise NotImplementedError
+
+    def _wait_for_deadline(self):
+        """Sleep until the next frame is due at the fixed input rate."""
+        now = time.monotonic()
+        if self._next_deadline is None:
+            self._next_deadline = now
+        delay = self._next_deadline - now
+        if delay > 0:
+            time.sleep(delay)
+        # Schedule from the deadline, not from now, so the rate does not drift
+        self._next_deadline = max(self._next_deadline + 1.0 / self.fps,
+                                  time.monotonic() - 1.0 / self.fps)
+
+    def release(self):
+        """Release the underlying device or file."""
+        pass
+
+
+class V4L2Source(FrameSource):
+    """Live webcam via OpenCV's V4L2 backend.
+
+    At decode_scale > 1 the raw MJPEG buffer is pulled from the driver and
+    decoded directly at reduced size instead of letting OpenCV decode
+    every frame at full resolution.
+    """
+    supports_reduced_decode = True
+
+    def __init__(self, device="/dev/video0", width=640, height=480, fps=24):
+        # The camera paces itself, so no software deadline here
+        super().__init__(fps=None, flip=True)
+        self.device = device
+        self.width = width
+        self.height = height
+        self.camera_fps = fps
+        self.cap = None
+        self.full_shape = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.device, cv2.CAP_V4L2)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        self.cap.set(cv2.CAP_PROP_FPS, self.camera_fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Minimize buffer size
+        # The driver may negotiate a different size than requested
+        self.full_shape = (int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                           int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def set_decode_scale(self, scale):
+        scale = super().set_decode_scale(scale)
+        if self.cap is not None:
+            # Without RGB conversion, V4L2 hands back the undecoded MJPEG buffer
+            self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 1 if scale == 1 else 0)
+        return scale
+
+    def frame_shape(self):
+        h, w, c = self.full_shape
+        return (_scaled(h, self.decode_scale), _scaled(w, self.decode_scale), c)
+
+    def _read(self, out):
+        if self.decode_scale == 1:
+            ret, frame = self.cap.read(out)
+            return frame if ret else None
+        ret, buf = self.cap.read()
+        if not ret:
+            return None
+        return cv2.imdecode(buf, REDUCED_DECODE_FLAGS[self.decode_scale])
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Frames from a recorded video file, optionally looping."""
+
+    def __init__(self, path, fps=None, loop=True, flip=False):
+        super().__init__(fps=fps, flip=flip)
+        self.path = path
+        self.loop = loop
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if self.fps is None:
+            # Default to the file's own frame rate
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or None
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def frame_shape(self):
+        return (int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+
+    def _read(self, out):
+        ret, frame = self.cap.read(out)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(out)
+        return frame if ret else None
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """Frames from a list of image files or a glob pattern.
+
+    With jpeg=True the images are kept JPEG-encoded and decoded on every
+    read, like an MJPEG camera, so decode cost shows up in benchmarks and
+    reduced-scale decoding is available.
+    """
+
+    def __init__(self, paths, fps=30, loop=True, flip=False, size=None, jpeg=False):
+        super().__init__(fps=fps, flip=flip)
+        if isinstance(paths, str):
+            paths = sorted(glob.glob(paths)) if not os.path.isfile(paths) else [paths]
+        self.paths = list(paths)
+        self.loop = loop
+        self.size = size
+        self.jpeg = jpeg
+        self.supports_reduced_decode = jpeg
+        self.images = []
+        self.full_shape = None
+        self.index = 0
+
+    def open(self):
+        # Decode everything up front so disk I/O never shows up in measurements
+        self.images = []
+        for path in self.paths:
+            image = cv2.imread(path)
+            if image is None:
+                continue
+            if self.size is not None:
+                image = cv2.resize(image, self.size)
+            if self.full_shape is None:
+                self.full_shape = image.shape
+            if self.jpeg:
+                image = cv2.imencode(".jpg", image)[1]
+            self.images.append(image)
+
+    def is_opened(self):
+        return len(self.images) > 0
+
+    def frame_shape(self):
+        h, w, c = self.full_shape
+        return (_scaled(h, self.decode_scale), _scaled(w, self.decode_scale), c)
+
+    def _read(self, out):
+        if self.index >= len(self.images):
+            if not self.loop:
+                return None
+            self.index = 0
+        frame = self.images[self.index]
+        self.index += 1
+        if self.jpeg:
+            return cv2.imdecode(frame, REDUCED_DECODE_FLAGS[self.decode_scale])
+        if out is not None and out.shape == frame.shape:
+            np.copyto(out, frame)
+            return out
+        return frame.copy()
+
+    def release(self):
+        self.images = []
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames with a moving skin-coloured blob, no files needed."""
+
+    def __init__(self, width=640, height=480, fps=30, radius=40):
+        super().__init__(fps=fps, flip=False)
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.background = None
+
+    def open(self):
+        # Static noise background so frames are not trivially compressible
+        rng = np.random.default_rng(0)
+        self.background = rng.integers(0, 64, (self.height, self.width, 3), dtype=np.uint8)
+
+    def is_opened(self):
+        return self.background is not None
+
+    def frame_shape(self):
+        return (self.height, self.width, 3)
+
+    def _read(self, out):
+        if out is not None:
+            np.copyto(out, self.background)
+            frame = out
+        else:
+            frame = self.background.copy()
+        t = self.frames_read / float(self.fps or 30)
+        cx = int(self.width / 2 + self.width / 3 * np.sin(t))
+        cy = int(self.height / 2 + self.height / 3 * np.cos(t * 0.7))
+        cv2.circle(frame, (cx, cy), self.radius, (120, 160, 220), -1)
+        return frame
+
+    def release(self):
+        self.background = None
+
+
+def open_source(spec, fps=None):
+    """Create a frame source from a command-line style spec.
+
+    "synthetic", "/dev/videoN", a video file path, or an image path/glob.
+    """
+    if spec is None or spec.startswith("/dev/video"):
+        return V4L2Source(spec or "/dev/video0")
+    if spec == "synthetic":
+        return SyntheticSource(fps=fps or 30)
+    ext = os.path.splitext(spec)[1].lower()
+    if ext in (".mp4", ".avi", ".mkv", ".mov", ".webm"):
+        return VideoFileSource(spec, fps=fps)
+    # Match the live camera's resolution and MJPEG decoding so measurements are comparable
+    return ImageSequenceSource(spec, fps=fps or 30, size=(640, 480), jpeg=True)
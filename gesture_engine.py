@@ -0,0 +1,144 @@
+import numpy as np
+
+# Gesture states; a gesture is "on" while ACTIVE or RELEASING
+IDLE, PENDING, ACTIVE, RELEASING = range(4)
+
+# Per-frame input: predicate level (OFF past the exit threshold, HOLD in the
+# hysteresis band, ON past the enter threshold) times whether the current
+# state's dwell time has elapsed. Inside the band a pending gesture keeps
+# counting towards on and a releasing one towards off.
+OFF, HOLD, ON = range(3)
+
+# TRANSITIONS[state, level * 2 + dwell_done] -> next state
+TRANSITIONS = np.array([
+    # OFF,      OFF+done,  HOLD,      HOLD+done, ON,        ON+done
+    [IDLE,      IDLE,      IDLE,      IDLE,      PENDING,   PENDING],    # IDLE
+    [IDLE,      IDLE,      PENDING,   ACTIVE,    PENDING,   ACTIVE],     # PENDING
+    [RELEASING, RELEASING, ACTIVE,    ACTIVE,    ACTIVE,    ACTIVE],     # ACTIVE
+    [RELEASING, IDLE,      RELEASING, IDLE,      ACTIVE,    ACTIVE],     # RELEASING
+], dtype=np.int8)
+
+
+class Gesture:
+    """Declarative gesture: one landmark predicate with hysteresis and dwell times.
+
+    With c unset the predicate is the distance between landmarks a and b;
+    with c set it is the angle in degrees at b between a-b and c-b. The
+    gesture turns on once the value has been past enter for enter_dwell
+    seconds and off once it has been past exit for exit_dwell seconds; in
+    between it keeps its state, which stops chatter at the threshold.
+    below=True means "on" is small values (a pinch), False large ones.
+    While on, a gesture with repeat > 0 emits a "repeat" event every
+    repeat seconds.
+    """
+
+    def __init__(self, name, a, b, enter, exit, c=None, below=True,
+                 enter_dwell=0.0, exit_dwell=0.0, repeat=0.0):
+        if (exit <= enter) if below else (exit >= enter):
+            raise ValueError(f"Gesture {name!r}: exit threshold must be looser than enter")
+        self.name = name
+        self.a, self.b, self.c = a, b, c
+        self.enter, self.exit = enter, exit
+        self.below = below
+        self.enter_dwell = enter_dwell
+        self.exit_dwell = exit_dwell
+        self.repeat = repeat
+
+
+# Click, drag and zoom on the right hand; thumb tip is landmark 4.
+# "drag" shares the pinch predicate and turns on after the pinch is held 0.5s.
+MOUSE_GESTURES = (
+    Gesture("pinch", 4, 8, enter=0.05, exit=0.065),                      # thumb to index
+    Gesture("drag", 4, 8, enter=0.05, exit=0.065, enter_dwell=0.5),
+    Gesture("zoom_in", 4, 12, enter=0.05, exit=0.065, repeat=0.5),      # thumb to middle
+    Gesture("zoom_out", 4, 16, enter=0.05, exit=0.065, repeat=0.5),     # thumb to ring
+)
+
+
+class GestureEngine:
+    """Evaluates a set of Gestures on one hand per frame.
+
+    The gestures are compiled into index and threshold arrays, so each
+    update() computes every predicate with one gather, then advances every
+    gesture's state machine with one lookup in TRANSITIONS. The table is
+    applied twice per frame so zero-dwell gestures go from IDLE to ACTIVE
+    (and back) on the frame their predicate changes. Cost per frame does
+    not depend on which gestures are active; only emitted events are
+    handled in Python.
+    """
+
+    def __init__(self, gestures=MOUSE_GESTURES):
+        self.gestures = tuple(gestures)
+        self.names = [g.name for g in self.gestures]
+        self.a = np.array([g.a for g in self.gestures])
+        self.b = np.array([g.b for g in self.gestures])
+        self.angle_rows = np.array([i for i, g in enumerate(self.gestures) if g.c is not None],
+                                   dtype=int)
+        self.angle_c = np.array([self.gestures[i].c for i in self.angle_rows], dtype=int)
+        # Compare "sign * value < sign * threshold" so both directions share one test
+        sign = np.array([1.0 if g.below else -1.0 for g in self.gestures])
+        self.sign = sign
+        self.enter = sign * np.array([g.enter for g in self.gestures])
+        self.exit = sign * np.array([g.exit for g in self.gestures])
+        self.dwell = np.zeros((4, len(self.gestures)))
+        self.dwell[PENDING] = [g.enter_dwell for g in self.gestures]
+        self.dwell[RELEASING] = [g.exit_dwell for g in self.gestures]
+        self.repeat = np.array([g.repeat for g in self.gestures])
+        self.columns = np.arange(len(self.gestures))
+        self.reset()
+
+    def reset(self):
+        """Turn every gesture off without emitting events, e.g. when the hand is lost."""
+        n = len(self.gestures)
+        self.state = np.full(n, IDLE, dtype=np.int8)
+        self.since = np.zeros(n)  # When the current state was entered
+        self.active_since = np.zeros(n)
+        self.next_repeat = np.full(n, np.inf)
+
+    def values(self, hand):
+        """Current predicate values for hand (a HandLandmarks)."""
+        values = hand.distances[self.a, self.b].astype(float)
+        if len(self.angle_rows):
+            points = hand.array
+            u = points[self.a[self.angle_rows]] - points[self.b[self.angle_rows]]
+            v = points[self.angle_c] - points[self.b[self.angle_rows]]
+            cos = np.einsum("ij,ij->i", u, v) / (
+                np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1) + 1e-9)
+            values[self.angle_rows] = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+        return values
+
+    def update(self, hand, now):
+        """Advance all gestures by one frame of hand at time now.
+
+        Returns (name, event, held_seconds) tuples in gesture order, where
+        event is "start", "repeat" or "end".
+        """
+        v = self.sign * self.values(hand)
+        level = np.where(v < self.enter, ON, np.where(v > self.exit, OFF, HOLD))
+        before = self.state
+        state = before
+        for _ in range(2):
+            done = now - self.since >= self.dwell[state, self.columns]
+            nxt = TRANSITIONS[state, level * 2 + done]
+            self.since = np.where(nxt != state, now, self.since)
+            state = nxt
+        self.state = state
+
+        was_on = before >= ACTIVE
+        is_on = state >= ACTIVE
+        started = is_on & ~was_on
+        ended = was_on & ~is_on
+        self.active_since = np.where(started, now, self.active_since)
+        self.next_repeat = np.where(started, now + self.repeat, self.next_repeat)
+        repeating = is_on & ~started & (self.repeat > 0) & (now >= self.next_repeat)
+        self.next_repeat = np.where(repeating, now + self.repeat, self.next_repeat)
+
+        events = []
+        for i in np.flatnonzero(started | ended | repeating):
+            event = "start" if started[i] else "end" if ended[i] else "repeat"
+            events.append((self.names[i], event, now - self.active_since[i]))
+        return events
+
+    def active(self, name):
+        """Whether the named gesture is currently on."""
+        return bool(self.state[self.names.index(name)] >= ACTIVE)
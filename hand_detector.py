@@ -1,10 +1,21 @@
-import mediapipe as mp
+import threading
+import time
 import cv2
+import numpy as np
+from landmarks import LandmarkResults
+
+# Float16 hand landmarker bundle from
+# https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/hand_landmarker.task
+TASKS_MODEL_PATH = "hand_landmarker.task"
+# A Tasks result delivered before a pause in submissions this long is stale
+TASKS_STALE_AFTER = 0.5
 
 class HandDetector:
     def __init__(self, static_image_mode=False, max_num_hands=1, 
                  min_detection_confidence=0.7, min_tracking_confidence=0.5):
         """Initialize hand detector optimized for mouse control."""
+        # Imported on first use: it is the slowest import in the app
+        import mediapipe as mp
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
             static_image_mode=static_image_mode,
@@ -13,11 +24,17 @@ class HandDetector:
             min_tracking_confidence=min_tracking_confidence
         )
         self.mp_draw = mp.solutions.drawing_utils
+        self.rgb_frame = None  # Reused color-conversion buffer
+
+    def find_hands(self, frame, timestamp=None):
+        """Process the frame and detect hands, returning LandmarkResults arrays.
 
-    def find_hands(self, frame):
-        """Process the frame and detect hands."""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        return self.hands.process(rgb_frame)
+        Blocks until the frame is processed; timestamp is unused here.
+        """
+        if self.rgb_frame is None or self.rgb_frame.shape != frame.shape:
+            self.rgb_frame = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_frame)
+        return LandmarkResults.from_mediapipe(self.hands.process(self.rgb_frame))
 
     def draw_landmarks(self, frame, hand_landmarks):
         """Draw hand landmarks on the frame."""
@@ -29,50 +46,25 @@ class HandDetector:
             self.mp_draw.DrawingSpec(color=(0, 0, 255), thickness=1)
         )
 
-    def find_right_hand(self, results):
+    @staticmethod
+    def find_right_hand(results):
         """Find the right hand landmarks if present."""
-        if results is None or not results.multi_hand_landmarks:
+        if results is None:
             return None
-            
-        for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
-                                            results.multi_handedness):
-            if handedness.classification[0].label == "Right":
-                return hand_landmarks
-        return None
+        results = LandmarkResults.from_mediapipe(results)
+        right = np.flatnonzero(results.is_right)
+        if len(right) == 0:
+            return None
+        return results.hand(right[0])
 
-    def get_index_finger_pos(self, hand_landmarks):
+    @staticmethod
+    def get_index_finger_pos(hand_landmarks):
         """Get normalized coordinates of index finger tip."""
         if hand_landmarks:
-            index_tip = hand_landmarks.landmark[8]  # Index finger tip
-            return index_tip.x, index_tip.y
+            x, y = hand_landmarks.array[8, :2]  # Index finger tip
+            return float(x), float(y)
         return None
 
-    def check_pinch(self, hand_landmarks):
-        """Check if thumb and index finger are pinched."""
-        return self._check_finger_distance(hand_landmarks, 4, 8, 0.05)  # thumb to index
-    
-    def check_zoom_in(self, hand_landmarks):
-        """Check if thumb and middle finger are pinched for zoom in."""
-        return self._check_finger_distance(hand_landmarks, 4, 12, 0.05)  # thumb to middle
-    
-    def check_zoom_out(self, hand_landmarks):
-        """Check if thumb and ring finger are pinched for zoom out."""
-        return self._check_finger_distance(hand_landmarks, 4, 16, 0.05)  # thumb to ring
-        
-    def _check_finger_distance(self, hand_landmarks, finger1_id, finger2_id, threshold):
-        """Calculate distance between two finger tips."""
-        if not hand_landmarks:
-            return False
-            
-        finger1_tip = hand_landmarks.landmark[finger1_id]
-        finger2_tip = hand_landmarks.landmark[finger2_id]
-        
-        # Calculate distance between finger tips
-        distance = ((finger1_tip.x - finger2_tip.x)**2 + 
-                   (finger1_tip.y - finger2_tip.y)**2 + 
-                   (finger1_tip.z - finger2_tip.z)**2)**0.5
-        return distance < threshold
-
     def draw_mouse_pointer(self, frame, x, y):
         """Draw mouse pointer visualization at finger position."""
         h, w = frame.shape[:2]
@@ -82,6 +74,115 @@ class HandDetector:
         cv2.line(frame, (cx - 5, cy), (cx + 5, cy), (0, 255, 0), 1)
         cv2.line(frame, (cx, cy - 5), (cx, cy + 5), (0, 255, 0), 1)
     
+    def reset(self):
+        """Forget tracked hands so the next frame runs full palm detection.
+
+        This restarts the graph, so the next frame is nearly as slow as
+        the first one after construction.
+        """
+        self.hands.reset()
+
     def close(self):
         """Close the hands object."""
         self.hands.close()
+
+
+class HandDetectorHelpers(HandDetector):
+    """HandDetector's hand, finger and drawing helpers without a MediaPipe graph.
+
+    For a process whose detection runs elsewhere, e.g. in inference workers.
+    """
+
+    def __init__(self):
+        import mediapipe as mp
+        self.mp_hands = mp.solutions.hands
+        self.mp_draw = mp.solutions.drawing_utils
+
+    def find_hands(self, frame, timestamp=None):
+        raise RuntimeError("HandDetectorHelpers has no graph to detect with")
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class TasksHandDetector(HandDetector):
+    """HandDetector on the MediaPipe Tasks HandLandmarker in LIVE_STREAM mode.
+
+    find_hands() only submits the frame and returns at once with the most
+    recent result the landmarker has delivered, which usually belongs to
+    an earlier frame; its timestamp is that frame's capture time. The
+    runtime pipelines frames and drops the ones it has no time for, so
+    callers need no frame skipping of their own. Until the first result
+    arrives find_hands() returns None. The hand, finger and drawing
+    helpers are shared with HandDetector.
+    """
+
+    def __init__(self, static_image_mode=False, max_num_hands=1,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.5,
+                 model_path=TASKS_MODEL_PATH):
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python import vision
+        self.mp = mp
+        self.mp_hands = mp.solutions.hands
+        self.mp_draw = mp.solutions.drawing_utils
+        self.rgb_frame = None
+        self.lock = threading.Lock()
+        self.latest = None  # Newest LandmarkResults from the callback
+        self.last_timestamp_ms = -1
+        self.last_submit = None  # Capture timestamp of the last submitted frame
+        self.submitted = 0  # Frames passed to detect_async
+        self.completed = 0  # Results delivered; the runtime drops frames it has no time for
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result)
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def _on_result(self, result, image, timestamp_ms):
+        results = LandmarkResults.from_tasks(result, timestamp_ms / 1000.0)
+        with self.lock:
+            if self.latest is None or results.timestamp > self.latest.timestamp:
+                self.latest = results
+            self.completed += 1
+
+    def find_hands(self, frame, timestamp=None):
+        """Submit frame (captured at monotonic timestamp) and return the newest result."""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        if self.last_submit is not None and timestamp - self.last_submit > TASKS_STALE_AFTER:
+            # Not used for a while (e.g. the other mode ran); its last hand is stale
+            self.reset()
+        self.last_submit = timestamp
+        # Tasks requires strictly increasing integer millisecond timestamps
+        timestamp_ms = max(int(timestamp * 1000), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        if self.rgb_frame is None or self.rgb_frame.shape != frame.shape:
+            self.rgb_frame = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_frame)
+        image = self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=self.rgb_frame)
+        self.landmarker.detect_async(image, timestamp_ms)
+        self.submitted += 1
+        with self.lock:
+            return self.latest
+
+    def stats(self):
+        """Frames submitted, results delivered and the difference (dropped or in flight)."""
+        with self.lock:
+            return {"submitted": self.submitted, "completed": self.completed,
+                    "dropped": max(self.submitted - self.completed, 0)}
+
+    def reset(self):
+        """Forget the last result so a stale hand is not reported after a switch."""
+        with self.lock:
+            self.latest = None
+
+    def close(self):
+        """Close the landmarker."""
+        self.landmarker.close()
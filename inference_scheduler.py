@@ -0,0 +1,121 @@
+import collections
+import threading
+import time
+import numpy as np
+
+class InferenceScheduler:
+    """Decides per frame whether to run hand detection.
+
+    Replaces the fixed process_interval. It keeps running estimates of
+    inference latency and hand speed and picks a detection interval:
+
+    - fast motion: every frame, so the cursor never jumps by more than
+      max_step (normalized units) between detections,
+    - hand still: back off towards still_interval,
+    - no hand: search every search_interval,
+    - never faster than the measured inference latency allows, and
+      frames already older than the latency target are skipped so a
+      backlog drains instead of growing.
+
+    Every decision is counted by reason and the last few are kept in
+    history; stats() exposes both for tuning, log_line() the counts.
+    """
+
+    def __init__(self, target_latency=0.1, max_step=0.01, still_interval=0.2,
+                 search_interval=0.1, smoothing=0.2, history=120):
+        self.target_latency = target_latency
+        self.max_step = max_step
+        self.still_interval = still_interval
+        self.search_interval = search_interval
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+
+        self.inference_latency = 0.0  # EWMA seconds per detection
+        self.speed = 0.0  # EWMA hand speed, normalized units per second
+        self.hand_present = False
+        self.interval = 0.0
+        self.last_run = 0.0
+        self.last_position = None
+        self.last_position_time = None
+        self.reasons = collections.Counter()
+        self.history = collections.deque(maxlen=history)
+
+    def should_process(self, capture_timestamp, now=None):
+        """Return True if the frame captured at capture_timestamp should be detected."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.interval = self._choose_interval()
+            since_last = now - self.last_run
+            age = now - capture_timestamp
+            if since_last >= max(self.still_interval, self.search_interval) * 2:
+                # Never starve detection, whatever the other signals say
+                run, reason = True, "forced"
+            elif age + self.inference_latency > self.target_latency and since_last < self.interval * 2:
+                run, reason = False, "stale"
+            elif since_last >= self.interval:
+                run, reason = True, "motion" if self.hand_present else "search"
+            else:
+                run, reason = False, "backoff"
+            if run:
+                self.last_run = now
+            self.reasons[reason] += 1
+            self.history.append((round(now, 4), reason, round(self.interval * 1000, 1)))
+            return run
+
+    def _choose_interval(self):
+        if not self.hand_present:
+            interval = self.search_interval
+        elif self.speed > 0:
+            interval = min(self.max_step / self.speed, self.still_interval)
+        else:
+            interval = self.still_interval
+        # Running detection more often than it takes just builds a queue
+        return max(interval, self.inference_latency)
+
+    def observe(self, results, inference_seconds, capture_timestamp):
+        """Feed back one detection: its duration and the resulting hand position."""
+        with self.lock:
+            a = self.smoothing
+            self.inference_latency += a * (inference_seconds - self.inference_latency)
+            landmarks = getattr(results, "landmarks", None)
+            if landmarks is None or len(landmarks) == 0:
+                self.hand_present = False
+                self.last_position = None
+                self.speed = 0.0
+                return
+            self.hand_present = True
+            position = landmarks[0, :, :2].mean(axis=0)
+            if self.last_position is not None:
+                dt = capture_timestamp - self.last_position_time
+                if dt > 0:
+                    speed = float(np.linalg.norm(position - self.last_position)) / dt
+                    self.speed += a * (speed - self.speed)
+            self.last_position = position
+            self.last_position_time = capture_timestamp
+
+    def stats(self):
+        """Current estimates and decision counts."""
+        with self.lock:
+            total = sum(self.reasons.values()) or 1
+            ran = self.reasons["motion"] + self.reasons["search"] + self.reasons["forced"]
+            return {
+                "interval_ms": round(self.interval * 1000, 1),
+                "inference_ms": round(self.inference_latency * 1000, 1),
+                "speed": round(self.speed, 3),
+                "hand_present": self.hand_present,
+                "run_ratio": round(ran / total, 3),
+                "reasons": dict(self.reasons),
+                "history": list(self.history),  # (time, reason, interval ms)
+            }
+
+    def overlay_line(self):
+        """Short summary for the preview overlay."""
+        s = self.stats()
+        return (f"sched: every {s['interval_ms']}ms, inference {s['inference_ms']}ms, "
+                f"run {s['run_ratio']:.0%}")
+
+    def log_line(self):
+        s = self.stats()
+        reasons = " ".join(f"{k}={v}" for k, v in sorted(s["reasons"].items()))
+        return (f"[Scheduler] interval={s['interval_ms']}ms inference={s['inference_ms']}ms "
+                f"speed={s['speed']} run_ratio={s['run_ratio']} {reasons}")
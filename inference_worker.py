@@ -0,0 +1,232 @@
+import multiprocessing as mp_proc
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from landmarks import LandmarkResults, PACKED_WIDTH
+
+def _worker_main(frame_name, result_name, frame_shape, max_hands, mode, detector_kwargs, conn):
+    """Entry point of an inference process: prewarmed detectors, frames via shared memory."""
+    # Imported here so the parent never pays for it on this code path
+    from detector_manager import DetectorManager
+
+    frame_shm = shared_memory.SharedMemory(name=frame_name)
+    result_shm = shared_memory.SharedMemory(name=result_name)
+    frame_buf = np.ndarray(frame_shape, dtype=np.uint8, buffer=frame_shm.buf)
+    result_buf = np.ndarray((max_hands, PACKED_WIDTH), dtype=np.float32, buffer=result_shm.buf)
+    detectors = DetectorManager(initial=mode, prewarm_shape=frame_shape, **detector_kwargs)
+    conn.send(("ready",))
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            if message[0] == "mode":
+                detectors.switch(message[1])
+                conn.send(("ready",))
+            elif message[0] == "frame":
+                _, seq, h, w = message
+                results = detectors.current().find_hands(frame_buf[:h, :w])
+                n = results.pack(result_buf)
+                conn.send(("result", seq, n))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        detectors.close()
+        del frame_buf, result_buf
+        frame_shm.close()
+        result_shm.close()
+
+
+class InferenceWorker:
+    """Parent-side handle for one inference process and its shared-memory buffers."""
+
+    def __init__(self, index, frame_shape, max_hands, detector_kwargs, mode="mouse",
+                 startup_timeout=30.0, frame_timeout=2.0, max_backoff=30.0):
+        self.index = index
+        self.frame_shape = tuple(frame_shape)
+        self.max_hands = max_hands
+        self.mode = mode
+        self.detector_kwargs = dict(detector_kwargs)
+        self.startup_timeout = startup_timeout
+        self.frame_timeout = frame_timeout
+        self.max_backoff = max_backoff
+        self.ctx = mp_proc.get_context("spawn")
+        self.frame_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.frame_shape)))
+        self.result_shm = shared_memory.SharedMemory(
+            create=True, size=max_hands * PACKED_WIDTH * 4)
+        self.frame_buf = np.ndarray(self.frame_shape, dtype=np.uint8, buffer=self.frame_shm.buf)
+        self.result_buf = np.ndarray((max_hands, PACKED_WIDTH), dtype=np.float32,
+                                     buffer=self.result_shm.buf)
+        self.process = None
+        self.conn = None
+        self.seq = 0
+        self.restarts = 0
+        self.backoff = 0.0  # Delay before the next restart attempt; 0 while healthy
+        self.retry_at = None  # When a failed worker may be started again
+        self.lock = threading.Lock()  # One frame or mode request at a time
+        try:
+            self.start()
+        except BaseException:
+            # Not in a pool yet, so nothing else would free the shared memory
+            self._kill()
+            self._free_buffers()
+            raise
+
+    def start(self):
+        """Spawn the worker process and wait until its detector is built."""
+        self.conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=_worker_main, name=f"inference-{self.index}", daemon=True,
+            args=(self.frame_shm.name, self.result_shm.name, self.frame_shape,
+                  self.max_hands, self.mode, self.detector_kwargs, child_conn))
+        self.process.start()
+        child_conn.close()
+        if not self._wait_ready():
+            raise RuntimeError(f"Inference worker {self.index} failed to start")
+
+    def _wait_ready(self):
+        try:
+            return (self.conn.poll(self.startup_timeout)
+                    and self.conn.recv() == ("ready",))
+        except (EOFError, OSError):
+            return False
+
+    def restart(self):
+        """Kill a hung or crashed worker and start a fresh one; False if it would not start.
+
+        After a failed start, further attempts are spaced out with
+        exponential backoff (up to max_backoff seconds); until then the
+        worker stays down and find_hands() returns None.
+        """
+        self.restarts += 1
+        print(f"[InferenceWorker] restarting worker {self.index} (restart #{self.restarts})")
+        self._kill()
+        self.process = None
+        try:
+            self.start()
+        except (RuntimeError, OSError) as e:
+            self.backoff = min(max(self.backoff * 2, 0.5), self.max_backoff)
+            self.retry_at = time.monotonic() + self.backoff
+            print(f"[InferenceWorker] {e}; retrying in {self.backoff:.1f}s")
+            return False
+        self.backoff = 0.0
+        self.retry_at = None
+        return True
+
+    def _available(self):
+        """Whether the worker is up, restarting it if its backoff has passed."""
+        if self.retry_at is None:
+            return True
+        if time.monotonic() < self.retry_at:
+            return False
+        return self.restart()
+
+    def set_mode(self, mode):
+        """Switch to the worker's prewarmed detector for mode."""
+        self._request(("mode", mode), mode=mode)
+
+    def _request(self, message, mode=None):
+        with self.lock:
+            if mode is not None:
+                self.mode = mode
+            if not self._available():
+                return  # Picks up the mode when it is restarted
+            try:
+                self.conn.send(message)
+                if self._wait_ready():
+                    return
+            except (BrokenPipeError, OSError):
+                pass
+            self.restart()
+
+    def find_hands(self, frame):
+        """Run detection on frame in the worker; None if it had to be restarted or is down."""
+        h, w = frame.shape[:2]
+        if h > self.frame_shape[0] or w > self.frame_shape[1]:
+            raise ValueError(f"Frame {frame.shape} does not fit worker buffer {self.frame_shape}")
+        with self.lock:
+            if not self._available():
+                return None
+            self.seq += 1
+            np.copyto(self.frame_buf[:h, :w], frame)
+            try:
+                self.conn.send(("frame", self.seq, h, w))
+                if self.conn.poll(self.frame_timeout):
+                    reply = self.conn.recv()
+                    if reply[0] == "result" and reply[1] == self.seq:
+                        return LandmarkResults.unpack(self.result_buf, reply[2])
+            except (EOFError, BrokenPipeError, OSError):
+                pass
+            # Crashed, hung or out of sync: start over with a clean process
+            self.restart()
+            return None
+
+    def _kill(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1.0)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        if self.conn is not None:
+            self.conn.close()
+
+    def close(self):
+        """Stop the worker and free its shared memory."""
+        if self.process is not None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=2.0)
+        self._kill()
+        self._free_buffers()
+
+    def _free_buffers(self):
+        del self.frame_buf, self.result_buf
+        for shm in (self.frame_shm, self.result_shm):
+            shm.close()
+            shm.unlink()
+
+
+class InferencePool:
+    """A set of InferenceWorker processes behind a thread-safe find_hands().
+
+    Each calling thread borrows an idle worker for the duration of one
+    frame, so N process threads can keep N workers busy while capture,
+    drawing and cursor output stay in the main interpreter.
+    """
+
+    def __init__(self, num_workers=1, frame_shape=(120, 160, 3), max_hands=2, mode="mouse",
+                 **detector_kwargs):
+        self.workers = []
+        self.idle = queue.Queue()
+        try:
+            for i in range(num_workers):
+                worker = InferenceWorker(i, frame_shape, max_hands, detector_kwargs, mode)
+                self.workers.append(worker)
+                self.idle.put(worker)
+        except Exception:
+            self.close()
+            raise
+
+    def find_hands(self, frame):
+        """Detect hands using whichever worker is free."""
+        worker = self.idle.get()
+        try:
+            return worker.find_hands(frame)
+        finally:
+            self.idle.put(worker)
+
+    def set_mode(self, mode):
+        """Switch every worker to its prewarmed detector for mode."""
+        for worker in self.workers:
+            worker.set_mode(mode)
+
+    def close(self):
+        """Shut down all workers and release shared memory."""
+        for worker in self.workers:
+            worker.close()
+        self.workers = []
@@ -0,0 +1,85 @@
+import collections
+import threading
+import time
+from tracing import StageHistogram
+
+class InputInjector:
+    """Dedicated thread that performs mouse/keyboard intents on a backend.
+
+    push() never blocks: it appends an intent (a backend method name and
+    its arguments) and returns. Consecutive move_to intents are merged so
+    only the latest position is injected, while button and key intents
+    keep their order relative to each other and to the moves around them.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.intents = collections.deque()
+        self.cond = threading.Condition()
+        self.running = True
+        self.latency = StageHistogram()
+        self.injected = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.thread = threading.Thread(target=self._run, name="input-injector", daemon=True)
+        self.thread.start()
+
+    def push(self, action, *args):
+        """Queue backend.<action>(*args) for injection."""
+        now = time.monotonic()
+        with self.cond:
+            if action == "move_to" and self.intents and self.intents[-1][0] == "move_to":
+                self.intents[-1] = (action, args, now)
+                self.coalesced += 1
+            else:
+                self.intents.append((action, args, now))
+                if len(self.intents) > self.max_depth:
+                    self.max_depth = len(self.intents)
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.intents and self.running:
+                    self.cond.wait()
+                if not self.intents:
+                    return
+                action, args, queued_at = self.intents.popleft()
+            try:
+                getattr(self.backend, action)(*args)
+                self.injected += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"[InputInjector] Error in {action}: {str(e)}")
+            now = time.monotonic()
+            self.latency.record(now - queued_at, now)
+
+    def depth(self):
+        """Number of intents waiting to be injected."""
+        return len(self.intents)
+
+    def stats(self):
+        count, ps = self.latency.percentiles((50, 95))
+        return {
+            "depth": self.depth(),
+            "max_depth": self.max_depth,
+            "injected": self.injected,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "latency_p50_ms": ps.get(50),
+            "latency_p95_ms": ps.get(95),
+        }
+
+    def log_line(self):
+        s = self.stats()
+        return (f"[InputInjector] depth={s['depth']} max_depth={s['max_depth']} "
+                f"injected={s['injected']} coalesced={s['coalesced']} errors={s['errors']} "
+                f"latency p50/p95={s['latency_p50_ms']}/{s['latency_p95_ms']}ms")
+
+    def close(self, timeout=1.0):
+        """Inject whatever is still queued, then stop the thread."""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout)
@@ -0,0 +1,184 @@
+"""
+Compact landmark recordings and their replay.
+
+A recording is a 64-byte header followed by fixed-size records, one per
+frame handled by the main loop, so it can be appended to cheaply while
+running and memory-mapped as a NumPy structured array afterwards:
+
+    timestamp    float64  capture time of the frame (monotonic seconds)
+    detected_at  float64  capture time of the frame the landmarks came from
+    hands        uint32   number of valid rows in data
+    data         float32  (max_hands, PACKED_WIDTH) rows from LandmarkResults.pack()
+
+Replaying feeds the records through the same HandDetector helpers and
+MouseController.follow_hand() as the live app, with the original timing
+or as fast as possible:
+
+    python3 main.py --record-landmarks session.lmrec
+    python3 landmark_recording.py session.lmrec            # as fast as possible
+    python3 landmark_recording.py session.lmrec --speed 1  # original timing
+"""
+
+import argparse
+import os
+import struct
+import time
+import numpy as np
+from hand_detector import HandDetector
+from landmarks import LandmarkResults, PACKED_WIDTH
+
+MAGIC = b"LMREC\x00\x00\x01"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIII")  # magic, version, max_hands, packed width, frame w, frame h
+HEADER_SIZE = 64
+
+def record_dtype(max_hands):
+    """Structured dtype of one record for max_hands hands."""
+    return np.dtype([("timestamp", "<f8"), ("detected_at", "<f8"), ("hands", "<u4"),
+                     ("pad", "<u4"), ("data", "<f4", (max_hands, PACKED_WIDTH))])
+
+
+def pack_record(row, results, timestamp):
+    """Fill one record (a 0-d or length-1 structured array) from results."""
+    row["timestamp"] = timestamp
+    if results is None:
+        row["detected_at"] = timestamp
+        row["hands"] = 0
+    else:
+        results = LandmarkResults.from_mediapipe(results)
+        detected_at = results.timestamp
+        row["detected_at"] = timestamp if detected_at is None else detected_at
+        row["hands"] = results.pack(row["data"].reshape(row["data"].shape[-2:]))
+
+
+class LandmarkRecorder:
+    """Appends one record per frame to a recording file."""
+
+    def __init__(self, path, frame_size, max_hands=2):
+        self.path = path
+        self.max_hands = max_hands
+        self.row = np.zeros(1, dtype=record_dtype(max_hands))
+        self.frames = 0
+        self.file = open(path, "wb")
+        header = HEADER.pack(MAGIC, VERSION, max_hands, PACKED_WIDTH, *frame_size)
+        self.file.write(header.ljust(HEADER_SIZE, b"\x00"))
+
+    def record(self, results, timestamp):
+        """Append the results handled for the frame captured at timestamp."""
+        pack_record(self.row, results, timestamp)
+        self.file.write(self.row.tobytes())
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+
+class LandmarkRecording:
+    """Read-only, memory-mapped view of a recording file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, max_hands, width, frame_w, frame_h = HEADER.unpack(
+                f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} landmark recording")
+        if width != PACKED_WIDTH:
+            raise ValueError(f"{path} has {width} values per hand, expected {PACKED_WIDTH}")
+        self.max_hands = max_hands
+        self.frame_size = (frame_w, frame_h)
+        dtype = record_dtype(max_hands)
+        # A record cut short by a crash is ignored
+        count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+        self.records = (np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+                        if count else np.zeros(0, dtype=dtype))
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        return self.records["timestamp"]
+
+    def results(self, index):
+        """LandmarkResults of record index, with timestamp set to its detection time."""
+        row = self.records[index]
+        results = LandmarkResults.unpack(row["data"], int(row["hands"]))
+        results.timestamp = float(row["detected_at"])
+        return results
+
+
+class LandmarkReplayer:
+    """Feeds a recording through the gesture and cursor layers.
+
+    Recorded times are shifted to start now, and gesture timing uses the
+    shifted frame times rather than the wall clock, so clicks, drags and
+    zoom cooldowns come out the same at any speed. speed=None runs as fast
+    as possible; 1.0 keeps the original pacing. With a PredictiveCursor,
+    each frame also moves the mouse to the position it predicts at that
+    frame's time, standing in for the cursor thread.
+    """
+
+    def __init__(self, recording, mouse, detector=HandDetector, cursor=None, speed=None):
+        self.recording = recording
+        self.mouse = mouse
+        self.detector = detector  # Only its model-free helpers are used
+        self.cursor = cursor
+        self.speed = speed
+
+    def run(self):
+        """Replay every record; returns frame count, elapsed time and rate."""
+        frame_w, frame_h = self.recording.frame_size
+        timestamps = self.recording.timestamps
+        start = time.monotonic()
+        offset = start - float(timestamps[0]) if len(timestamps) else 0.0
+        cursor_moves = 0
+        for i in range(len(self.recording)):
+            now = float(timestamps[i]) + offset
+            if self.speed:
+                delay = start + (now - start) / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            results = self.recording.results(i)
+            results.timestamp += offset
+            finger_pos = self.mouse.follow_hand(self.detector, results, frame_w, frame_h,
+                                                cursor=self.cursor, now=now)
+            if finger_pos is not None:
+                cursor_moves += 1
+                if self.cursor is not None:
+                    position = self.cursor.predict(now)
+                    if position is not None:
+                        self.mouse.move_mouse(*position)
+        elapsed = time.monotonic() - start
+        return {
+            "frames": len(self.recording),
+            "cursor_frames": cursor_moves,
+            "elapsed_s": round(elapsed, 3),
+            "replay_fps": round(len(self.recording) / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a landmark recording")
+    parser.add_argument("path", help="recording written with main.py --record-landmarks")
+    parser.add_argument("--speed", type=float,
+                        help="1 = original timing, 2 = twice as fast; default as fast as possible")
+    parser.add_argument("--predictive", action="store_true",
+                        help="drive the cursor through the One Euro predictive filter")
+    args = parser.parse_args()
+
+    # Counts injected events instead of performing them
+    from benchmark import RecordingBackend
+    from cursor_filter import PredictiveCursor
+    from mouse_controller import MouseController
+
+    recording = LandmarkRecording(args.path)
+    mouse = MouseController(smoothing_factor=0.7, backend=RecordingBackend())
+    cursor = PredictiveCursor(mouse.screen_w, mouse.screen_h) if args.predictive else None
+    stats = LandmarkReplayer(recording, mouse, cursor=cursor, speed=args.speed).run()
+    mouse.close()
+    for key, value in stats.items():
+        print(f"{key:>14}: {value}")
+    print(f"{'events':>14}: {mouse.backend.events}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Shared-memory ring of per-frame landmarks for other local processes.
+
+With --publish-landmarks the app writes every handled frame into a
+POSIX shared-memory block, so other programs on the machine can reuse
+its hand tracking instead of opening the camera and running MediaPipe
+themselves. The block is a 64-byte header, the sequence number of the
+newest frame, one sequence number per slot and then `capacity` records
+in the landmark_recording record format. The header also holds the
+publisher's PID, so a new publisher only replaces a ring whose publisher
+has exited:
+
+    timestamp    float64  capture time of the frame (CLOCK_MONOTONIC seconds)
+    detected_at  float64  capture time of the frame the landmarks came from
+    hands        uint32   number of valid rows in data
+    data         float32  (max_hands, PACKED_WIDTH) rows from LandmarkResults.pack()
+
+Frames are numbered from 1. The publisher never waits for readers: it
+overwrites the oldest slot, marking it invalid (0) while writing and
+stamping it with the frame's sequence number afterwards. A reader checks
+that stamp before and after using a slot (a seqlock), so it can work on
+the shared memory directly and only has to discard the frame if the
+producer lapped it in the meantime.
+
+    python3 main.py --publish-landmarks
+    python3 landmark_ring.py            # print frames as they arrive
+"""
+
+import argparse
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from landmark_recording import pack_record, record_dtype
+from landmarks import LandmarkResults, PACKED_WIDTH
+
+DEFAULT_NAME = "mediwave-landmarks"
+MAGIC = b"LMRING\x00\x01"
+VERSION = 1
+# magic, version, max_hands, packed width, capacity, frame w, frame h, publisher pid
+HEADER = struct.Struct("<8sIIIIIII")
+HEADER_SIZE = 64
+
+# Rings published by this process; their tracker registration belongs to the publisher
+_published = set()
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Someone else's process, but it exists
+    return True
+
+
+def _unlink_stale(name):
+    """Remove ring name left behind by a publisher that has exited.
+
+    Raises FileExistsError if its publisher is still running or the block
+    is not a landmark ring.
+    """
+    shm = shared_memory.SharedMemory(name)
+    try:
+        magic, version, *_, pid = HEADER.unpack(bytes(shm.buf[:HEADER.size]))
+        stale = magic == MAGIC and version == VERSION and not _pid_alive(pid)
+    except struct.error:
+        stale = False  # Too small to be a ring
+    if not stale:
+        # Attaching registered it with our tracker, which would unlink it at exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        shm.close()
+        raise FileExistsError(f"Shared memory {name} is in use by a running publisher "
+                              f"or another program; choose a different name")
+    shm.close()
+    shm.unlink()
+
+
+def _layout(capacity, max_hands):
+    """Byte offsets of the head counter, slot stamps and records, and the total size."""
+    head = HEADER_SIZE
+    stamps = head + 8
+    records = -(-(stamps + 8 * capacity) // 64) * 64  # Records start on a cache line
+    return head, stamps, records, records + capacity * record_dtype(max_hands).itemsize
+
+
+class _Ring:
+    """numpy views onto a ring's shared memory."""
+
+    def _map(self, capacity, max_hands):
+        head, stamps, records, _ = _layout(capacity, max_hands)
+        buf = self.shm.buf
+        self.capacity = capacity
+        self.max_hands = max_hands
+        self.head = np.ndarray((1,), dtype="<u8", buffer=buf, offset=head)
+        self.stamps = np.ndarray((capacity,), dtype="<u8", buffer=buf, offset=stamps)
+        self.records = np.ndarray((capacity,), dtype=record_dtype(max_hands), buffer=buf,
+                                  offset=records)
+
+    def _unmap(self):
+        # Views must go before the mapping can be closed
+        self.head = self.stamps = self.records = None
+        self.shm.close()
+
+
+class LandmarkPublisher(_Ring):
+    """Producer side: creates the ring and appends one record per handled frame."""
+
+    def __init__(self, frame_size, name=DEFAULT_NAME, capacity=256, max_hands=2):
+        size = _layout(capacity, max_hands)[3]
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Perhaps left behind by a publisher that did not shut down cleanly
+            _unlink_stale(name)
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = name
+        _published.add(name)
+        self._map(capacity, max_hands)
+        self.head[0] = 0
+        self.stamps[:] = 0
+        header = HEADER.pack(MAGIC, VERSION, max_hands, PACKED_WIDTH, capacity, *frame_size,
+                             os.getpid())
+        self.shm.buf[:HEADER.size] = header
+        self.published = 0
+
+    def publish(self, results, timestamp):
+        """Append the results handled for the frame captured at timestamp; returns its sequence number."""
+        seq = self.published + 1
+        i = (seq - 1) % self.capacity
+        self.stamps[i] = 0  # Readers treat the slot as being written
+        pack_record(self.records[i:i + 1], results, timestamp)
+        self.stamps[i] = seq
+        self.head[0] = seq
+        self.published = seq
+        return seq
+
+    def close(self):
+        """Remove the ring; readers that are attached keep their mapping."""
+        self._unmap()
+        self.shm.unlink()
+        _published.discard(self.name)
+
+
+class LandmarkReader(_Ring):
+    """Consumer side: attaches to a publisher's ring by name.
+
+    read(), latest() and since() return the capture time and the
+    LandmarkResults (timestamped with the detection time) copied out of
+    the ring. view() returns the record in shared memory itself, for
+    callers that want no copy at all; check valid(seq) after using it.
+    Raises FileNotFoundError if no publisher is running.
+    """
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.shm = shared_memory.SharedMemory(name)
+        if name not in _published:
+            # Readers must not unlink the block when they exit (the tracker would)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        magic, version, max_hands, width, capacity, frame_w, frame_h, _ = HEADER.unpack(
+            bytes(self.shm.buf[:HEADER.size]))
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError(f"{name} is not a version {VERSION} landmark ring")
+        if width != PACKED_WIDTH:
+            self.shm.close()
+            raise ValueError(f"{name} has {width} values per hand, expected {PACKED_WIDTH}")
+        self.name = name
+        self.frame_size = (frame_w, frame_h)
+        self._map(capacity, max_hands)
+
+    @property
+    def newest(self):
+        """Sequence number of the newest published frame (0 before the first)."""
+        return int(self.head[0])
+
+    @property
+    def oldest(self):
+        """Sequence number of the oldest frame still in the ring."""
+        return max(self.newest - self.capacity + 1, 1)
+
+    def valid(self, seq):
+        """Whether frame seq is still intact in the ring."""
+        return seq > 0 and int(self.stamps[(seq - 1) % self.capacity]) == seq
+
+    def view(self, seq):
+        """Zero-copy record of frame seq, or None if it is not in the ring."""
+        if not self.valid(seq):
+            return None
+        return self.records[(seq - 1) % self.capacity]
+
+    def read(self, seq):
+        """(captured_at, LandmarkResults) of frame seq, or None if it was overwritten."""
+        record = self.view(seq)
+        if record is None:
+            return None
+        hands = int(record["hands"])
+        results = LandmarkResults.unpack(record["data"], min(hands, self.max_hands))
+        results.timestamp = float(record["detected_at"])
+        captured_at = float(record["timestamp"])
+        if not self.valid(seq):
+            return None  # Overwritten while being copied
+        return captured_at, results
+
+    def latest(self):
+        """(seq, captured_at, LandmarkResults) of the newest frame; (0, None, None) before the first."""
+        while True:
+            seq = self.newest
+            if seq == 0:
+                return 0, None, None
+            frame = self.read(seq)
+            if frame is not None:
+                return (seq, *frame)
+
+    def since(self, seq):
+        """(seq, captured_at, LandmarkResults) for each frame after seq still in the ring."""
+        for n in range(max(seq + 1, self.oldest), self.newest + 1):
+            frame = self.read(n)
+            if frame is not None:
+                yield (n, *frame)
+
+    def wait(self, seq, timeout=None, interval=0.002):
+        """Poll until a frame newer than seq is published; returns the newest sequence number."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.newest <= seq:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(interval)
+        return self.newest
+
+    def close(self):
+        self._unmap()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print landmarks published by main.py")
+    parser.add_argument("--name", default=DEFAULT_NAME, help="shared-memory ring name")
+    args = parser.parse_args()
+
+    reader = LandmarkReader(args.name)
+    seq = reader.newest
+    try:
+        while True:
+            newest = reader.wait(seq, timeout=1.0)
+            if newest == seq:
+                continue
+            if newest - seq > reader.capacity:
+                print(f"missed {newest - seq - reader.capacity} frames")
+            for seq, captured_at, results in reader.since(seq):
+                age_ms = (time.monotonic() - captured_at) * 1000
+                hands = ", ".join(f"{'right' if right else 'left'} ({score:.2f})"
+                                  for right, score in zip(results.is_right, results.scores))
+                print(f"#{seq} age {age_ms:.1f} ms: {hands or 'no hands'}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+# Packed row layout: 21 x (x, y, z), then is_right, handedness score
+PACKED_WIDTH = NUM_LANDMARKS * 3 + 2
+
+class Landmark:
+    """Minimal stand-in for a MediaPipe NormalizedLandmark."""
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def HasField(self, name):
+        # No visibility/presence fields, so drawing_utils draws every point
+        return False
+
+
+class HandLandmarks:
+    """One hand backed by a (21, 3) float32 array, with a protobuf-like .landmark list.
+
+    distances is this hand's (21, 21) slice of the pairwise-distance
+    matrix, which the gesture engine reads its predicates from.
+    """
+    __slots__ = ("array", "distances", "_landmark")
+
+    def __init__(self, array, distances=None):
+        self.array = array
+        self.distances = distances
+        self._landmark = None
+
+    @property
+    def landmark(self):
+        if self._landmark is None:
+            self._landmark = [Landmark(float(x), float(y), float(z)) for x, y, z in self.array]
+        return self._landmark
+
+
+class Classification:
+    __slots__ = ("label", "score", "index")
+
+    def __init__(self, label, score):
+        self.label = label
+        self.score = score
+        self.index = 0 if label == "Left" else 1
+
+
+class Handedness:
+    __slots__ = ("classification",)
+
+    def __init__(self, label, score):
+        self.classification = [Classification(label, score)]
+
+
+class LandmarkResults:
+    """Compact detection results that quack like MediaPipe's hands output.
+
+    landmarks is an (hands, 21, 3) float32 array, is_right and scores are
+    parallel (hands,) arrays. multi_hand_landmarks / multi_handedness are
+    built on demand so HandDetector and drawing code work unchanged.
+    timestamp is the capture time of the frame they were detected on.
+    """
+
+    def __init__(self, landmarks, is_right, scores, timestamp=None):
+        self.landmarks = landmarks
+        self.is_right = is_right
+        self.scores = scores
+        self.timestamp = timestamp
+        self._hands = None
+        self._handedness = None
+        self._distances = None
+
+    def distances(self):
+        """(hands, 21, 21) Euclidean distances between all landmark pairs, computed once."""
+        if self._distances is None:
+            diff = self.landmarks[:, :, None, :] - self.landmarks[:, None, :, :]
+            self._distances = np.sqrt(np.einsum("hijk,hijk->hij", diff, diff))
+        return self._distances
+
+    @property
+    def multi_hand_landmarks(self):
+        if len(self.landmarks) == 0:
+            return None
+        if self._hands is None:
+            distances = self.distances()
+            self._hands = [HandLandmarks(hand, distances[i])
+                           for i, hand in enumerate(self.landmarks)]
+        return self._hands
+
+    def hand(self, index):
+        """HandLandmarks for one hand, sharing the batched distance matrix."""
+        return self.multi_hand_landmarks[index]
+
+    @property
+    def multi_handedness(self):
+        if len(self.landmarks) == 0:
+            return None
+        if self._handedness is None:
+            self._handedness = [Handedness("Right" if right else "Left", float(score))
+                                for right, score in zip(self.is_right, self.scores)]
+        return self._handedness
+
+    @classmethod
+    def from_mediapipe(cls, results, max_hands=None):
+        """Convert a MediaPipe hands result into contiguous arrays."""
+        if isinstance(results, cls):
+            return results
+        hands = results.multi_hand_landmarks or []
+        handedness = results.multi_handedness or []
+        if max_hands is not None:
+            hands = hands[:max_hands]
+        n = len(hands)
+        landmarks = np.empty((n, NUM_LANDMARKS, 3), dtype=np.float32)
+        is_right = np.zeros(n, dtype=bool)
+        scores = np.zeros(n, dtype=np.float32)
+        for i, (hand, side) in enumerate(zip(hands, handedness)):
+            landmarks[i] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]
+            is_right[i] = side.classification[0].label == "Right"
+            scores[i] = side.classification[0].score
+        return cls(landmarks, is_right, scores)
+
+    @classmethod
+    def from_tasks(cls, result, timestamp=None):
+        """Convert a Tasks HandLandmarkerResult into contiguous arrays."""
+        hands = result.hand_landmarks or []
+        handedness = result.handedness or []
+        n = len(hands)
+        landmarks = np.empty((n, NUM_LANDMARKS, 3), dtype=np.float32)
+        is_right = np.zeros(n, dtype=bool)
+        scores = np.zeros(n, dtype=np.float32)
+        for i, (hand, side) in enumerate(zip(hands, handedness)):
+            landmarks[i] = [(lm.x, lm.y, lm.z) for lm in hand]
+            is_right[i] = side[0].category_name == "Right"
+            scores[i] = side[0].score
+        return cls(landmarks, is_right, scores, timestamp)
+
+    def pack(self, out):
+        """Write into an (max_hands, PACKED_WIDTH) float32 buffer; return hand count."""
+        n = min(len(self.landmarks), len(out))
+        out[:n, :NUM_LANDMARKS * 3] = self.landmarks[:n].reshape(n, NUM_LANDMARKS * 3)
+        out[:n, -2] = self.is_right[:n]
+        out[:n, -1] = self.scores[:n]
+        return n
+
+    @classmethod
+    def unpack(cls, buf, n):
+        """Copy n hands out of a packed buffer written by pack()."""
+        rows = np.array(buf[:n], dtype=np.float32)
+        return cls(rows[:, :NUM_LANDMARKS * 3].reshape(n, NUM_LANDMARKS, 3),
+                   rows[:, -2] > 0.5, rows[:, -1])
@@ -12,18 +12,28 @@ import os, sys
 from typing import Union
 
 keys = [uinput.KEY_LEFTSHIFT,
+    uinput.KEY_LEFTCTRL,
+    uinput.KEY_LEFTALT,
     uinput.KEY_SPACE,
+    uinput.KEY_TAB,
+    uinput.KEY_ENTER
+            ]
+
+# Absolute axis range of the pointer device; positions are scaled from screen pixels
+ABS_MAX = 32767
+
+pointer_events = [uinput.ABS_X + (0, ABS_MAX, 0, 0),
+    uinput.ABS_Y + (0, ABS_MAX, 0, 0),
     uinput.BTN_LEFT,
     uinput.BTN_MIDDLE,
     uinput.BTN_RIGHT,
-    uinput.REL_X,
-    uinput.REL_Y,
     uinput.REL_WHEEL,
-    uinput.REL_HWHEEL,
-    uinput.KEY_TAB,
-    uinput.KEY_ENTER
+    uinput.REL_HWHEEL
             ]
 
+buttons = [uinput.BTN_LEFT, uinput.BTN_MIDDLE, uinput.BTN_RIGHT]
+modifiers = {'ctrl': uinput.KEY_LEFTCTRL, 'shift': uinput.KEY_LEFTSHIFT, 'alt': uinput.KEY_LEFTALT}
+
 punctuation = {',':'COMMA', '.':'DOT', '/':'SLASH', ';':'SEMICOLON', "'":'APOSTROPHE',
             '[':'LEFTBRACE', ']':'RIGHTBRACE', '\\':'BACKSLASH', '-':'MINUS', '=':'EQUAL', '`':'GRAVE'}
 punctuation_shift = {'<':'COMMA', '>':'DOT', '?':'SLASH', ':':'SEMICOLON', '"':'APOSTROPHE',
@@ -32,29 +42,81 @@ punctuation_ = ',./;\'[]\\-=`'
 punctuation_shift_ = '<>?:\"{}|_+~'
 digit_symbols = {'!':'1', '@':'2', '#':'3', '$':'4', '%':'5', '^':'6', '&':'7', '*':'8', '(':'9', ')':'0'}
 
+# Character -> (needs shift, key event), built once
+keymap = {' ': (False, uinput.KEY_SPACE), '\t': (False, uinput.KEY_TAB), '\n': (False, uinput.KEY_ENTER)}
 for i in string.ascii_lowercase:
-    keys.append(eval('uinput.KEY_{}'.format(i.upper())))
+    keymap[i] = (False, getattr(uinput, 'KEY_' + i.upper()))
+    keymap[i.upper()] = (True, keymap[i][1])
 for i in string.digits:
-    keys.append(eval('uinput.KEY_{}'.format(i)))
+    keymap[i] = (False, getattr(uinput, 'KEY_' + i))
 for i in digit_symbols:
-    keys.append(eval('uinput.KEY_{}'.format(digit_symbols[i])))
+    keymap[i] = (True, getattr(uinput, 'KEY_' + digit_symbols[i]))
 for i in punctuation_:
-    keys.append(eval('uinput.KEY_{}'.format(punctuation[i])))
+    keymap[i] = (False, getattr(uinput, 'KEY_' + punctuation[i]))
 for i in punctuation_shift_:
-    keys.append(eval('uinput.KEY_{}'.format(punctuation_shift[i])))
-
-device = uinput.Device(keys)
-
-# Wait for the system to detect the new device
-time.sleep(1)
+    keymap[i] = (True, getattr(uinput, 'KEY_' + punctuation_shift[i]))
+# Printable but without a key; typed as nothing
+unmapped = '\r\x0b\x0c'
+
+for shifted, event in keymap.values():
+    if event not in keys:
+        keys.append(event)
+
+# Devices are created on first use, not at import time
+_keyboard = None
+_pointer = None
+screen_width, screen_height = 1920, 1080
+
+# Seconds to wait after creating a device for the system to detect it
+SETTLE_TIME = 1.0
+
+def _keyboard_device():
+    global _keyboard
+    if _keyboard is None:
+        _keyboard = uinput.Device(keys, name='libclicker-keyboard')
+        time.sleep(SETTLE_TIME)
+    return _keyboard
+
+def _pointer_device():
+    global _pointer
+    if _pointer is None:
+        _pointer = uinput.Device(pointer_events, name='libclicker-pointer')
+        time.sleep(SETTLE_TIME)
+    return _pointer
+
+def init():
+    """Create both devices now instead of on first use, settling them together."""
+    global _keyboard, _pointer
+    created = False
+    if _keyboard is None:
+        _keyboard = uinput.Device(keys, name='libclicker-keyboard')
+        created = True
+    if _pointer is None:
+        _pointer = uinput.Device(pointer_events, name='libclicker-pointer')
+        created = True
+    if created:
+        time.sleep(SETTLE_TIME)
+
+def set_screen_size(width : int, height : int):
+    """Set the screen size that absolute positions are scaled from."""
+    global screen_width, screen_height
+    screen_width, screen_height = width, height
 
 # Move the mouse to a given position
 
 def move_mouse(x : int, y : int):
-    device.emit(uinput.REL_X, -25000)
-    device.emit(uinput.REL_Y, -25000)
-    device.emit(uinput.REL_X, x//2)
-    device.emit(uinput.REL_Y, y//2)
+    # One absolute event frame: both axes land atomically on the next SYN_REPORT
+    pointer = _pointer_device()
+    pointer.emit(uinput.ABS_X, x * ABS_MAX // max(screen_width - 1, 1), syn=False)
+    pointer.emit(uinput.ABS_Y, y * ABS_MAX // max(screen_height - 1, 1))
+
+# Press or release a mouse button at the current position
+
+def press_button(btn : int = 0):
+    _pointer_device().emit(buttons[btn], 1)
+
+def release_button(btn : int = 0):
+    _pointer_device().emit(buttons[btn], 0)
 
 # Click at a given position
 
@@ -71,18 +133,18 @@ def click(x : int, y : int, btn : int = 0, count : int = 1):
     # Click the desired button
     if btn == 0:
         for i in range(count):
-            device.emit(uinput.BTN_LEFT, 1)
-            device.emit(uinput.BTN_LEFT, 0)
+            press_button(0)
+            release_button(0)
     elif btn == 1:
         for i in range(count):
             time.sleep(0.3)
-            device.emit(uinput.BTN_MIDDLE, 1)
-            device.emit(uinput.BTN_MIDDLE, 0)
+            press_button(1)
+            release_button(1)
     elif btn == 2:
         for i in range(count):
             time.sleep(0.3)
-            device.emit(uinput.BTN_RIGHT, 1)
-            device.emit(uinput.BTN_RIGHT, 0)
+            press_button(2)
+            release_button(2)
 
 # Scroll up or down
 
@@ -98,63 +160,67 @@ def scroll(x : int, y : int, count : int, direction : str = 'down'):
         val = -1
     if direction.lower() == 'up' or direction.lower() == 'down':
         for i in range(count):
-            device.emit(uinput.REL_WHEEL, val)
+            _pointer_device().emit(uinput.REL_WHEEL, val)
     elif direction.lower() == 'left' or direction.lower() == 'right':
         for i in range(count):
-            device.emit(uinput.REL_HWHEEL, val)
+            _pointer_device().emit(uinput.REL_HWHEEL, val)
 
 # Press a key
 
 def press_key(key : str):
     if type(key) != str:
         raise ValueError('key must be a string')
-    if key not in string.printable + '\t\n':
-        raise ValueError('key must be printable')
-    if len(key) > 1:
+    if len(key) != 1:
         raise ValueError('key must be a single character')
-    
-    if key in string.ascii_lowercase:
-        device.emit(eval('uinput.KEY_{}'.format(key.upper())), 1)
-        device.emit(eval('uinput.KEY_{}'.format(key.upper())), 0)
-    elif key in string.ascii_uppercase:
-        device.emit(uinput.KEY_LEFTSHIFT, 1)
-        device.emit(eval('uinput.KEY_{}'.format(key.upper())), 1)
-        device.emit(eval('uinput.KEY_{}'.format(key.upper())), 0)
-        device.emit(uinput.KEY_LEFTSHIFT, 0)
-    elif key in string.digits:
-        device.emit(eval('uinput.KEY_{}'.format(key)), 1)
-        device.emit(eval('uinput.KEY_{}'.format(key)), 0)
-    elif key in digit_symbols:
-        device.emit(uinput.KEY_LEFTSHIFT, 1)
-        device.emit(eval('uinput.KEY_{}'.format(digit_symbols[key])), 1)
-        device.emit(eval('uinput.KEY_{}'.format(digit_symbols[key])), 0)
-        device.emit(uinput.KEY_LEFTSHIFT, 0)
-    elif key in punctuation_:
-        device.emit(eval('uinput.KEY_{}'.format(punctuation[key])), 1)
-        device.emit(eval('uinput.KEY_{}'.format(punctuation[key])), 0)
-    elif key in punctuation_shift_:
-        device.emit(uinput.KEY_LEFTSHIFT, 1)
-        device.emit(eval('uinput.KEY_{}'.format(punctuation_shift[key])), 1)
-        device.emit(eval('uinput.KEY_{}'.format(punctuation_shift[key])), 0)
+    if key not in keymap and key not in unmapped:
+        raise ValueError('key must be printable')
+    _type_keys(_keyboard_device(), key)
+
+def _type_keys(device, text : str, rate : float = None):
+    # Two event frames per character: [shift change,] key down / key up.
+    # Shift stays down across a run of shifted characters.
+    period = 1.0 / rate if rate else 0.0
+    next_time = time.monotonic()
+    shift = False
+    for char in text:
+        entry = keymap.get(char)
+        if entry is None:
+            continue
+        shifted, event = entry
+        if period:
+            now = time.monotonic()
+            if next_time > now:
+                time.sleep(next_time - now)
+            # No catching up in a burst after a stall
+            next_time = max(next_time, now) + period
+        if shifted != shift:
+            shift = shifted
+            device.emit(uinput.KEY_LEFTSHIFT, int(shift), syn=False)
+        device.emit(event, 1)
+        device.emit(event, 0)
+    if shift:
         device.emit(uinput.KEY_LEFTSHIFT, 0)
-    elif key == ' ':
-        device.emit(uinput.KEY_SPACE, 1)
-        device.emit(uinput.KEY_SPACE, 0)
-    elif key == '\t':
-        device.emit(uinput.KEY_TAB, 1)
-        device.emit(uinput.KEY_TAB, 0)
-    elif key == '\n':
-        device.emit(uinput.KEY_ENTER, 1)
-        device.emit(uinput.KEY_ENTER, 0)
-    
-# Type text
 
-def type_text(text : str):
+# Type text, optionally limited to rate characters per second
+
+def type_text(text : str, rate : float = None):
     if type(text) != str:
         raise ValueError('text must be a string')
     for i in text:
-        if i not in string.printable:
+        if i not in keymap and i not in unmapped:
             raise ValueError('charactert {} is not printable'.format(i))
-    
-    for key in text:
-        press_key(key)
+    if rate is not None and rate <= 0:
+        raise ValueError('rate must be positive')
+    _type_keys(_keyboard_device(), text, rate)
+
+# Press a key combination, e.g. hotkey('ctrl', '+')
+
+def hotkey(*combo : str):
+    if not combo or any(k not in modifiers for k in combo[:-1]):
+        raise ValueError('hotkey takes modifiers ({}) followed by one key'.format(', '.join(modifiers)))
+    device = _keyboard_device()
+    for k in combo[:-1]:
+        device.emit(modifiers[k], 1)
+    press_key(combo[-1])
+    for k in reversed(combo[:-1]):
+        device.emit(modifiers[k], 0)
@@ -0,0 +1,48 @@
+import threading
+
+class Mailbox:
+    """Single-slot, latest-wins handoff between threads.
+
+    put() never blocks: a newer item replaces one that was not taken yet,
+    and the displaced item is handed to on_replace (outside the lock) so
+    its owner can release it. get() takes the item, leaving the slot
+    empty, so exactly one consumer ever owns a given item.
+    """
+
+    def __init__(self, on_replace=None):
+        self.cond = threading.Condition()
+        self.item = None
+        self.closed = False
+        self.on_replace = on_replace
+        self.puts = 0
+        self.replaced = 0
+
+    def put(self, item):
+        """Offer item; returns False if the mailbox is closed (item not taken)."""
+        with self.cond:
+            if self.closed:
+                return False
+            old, self.item = self.item, item
+            self.puts += 1
+            if old is not None:
+                self.replaced += 1
+            self.cond.notify()
+        if old is not None and self.on_replace is not None:
+            self.on_replace(old)
+        return True
+
+    def get(self, timeout=None):
+        """Take the current item, waiting up to timeout; None if nothing arrived."""
+        with self.cond:
+            if self.item is None and not self.closed:
+                self.cond.wait_for(lambda: self.item is not None or self.closed, timeout)
+            item, self.item = self.item, None
+            return item
+
+    def close(self):
+        """Refuse further items, wake waiting consumers and return any item left."""
+        with self.cond:
+            self.closed = True
+            item, self.item = self.item, None
+            self.cond.notify_all()
+        return item
@@ -1,8 +1,69 @@
-from app import HandTrackingApp
+import time
+STARTED = time.monotonic()  # Before any heavy import, for the startup report
+
+import argparse
+from performance_profile import load_profile
+from tracing import StartupTimer
+
+def _import_app():
+    from app import HandTrackingApp
+    return HandTrackingApp
 
 def main():
     """Main entry point of the application."""
-    app = HandTrackingApp()
+    parser = argparse.ArgumentParser(description="Hand tracking mouse control")
+    parser.add_argument("--trace-dump", help="write per-stage latency histograms here on exit")
+    parser.add_argument("--inference-workers", type=int, default=0,
+                        help="run MediaPipe in this many separate processes (0 = in-process)")
+    parser.add_argument("--roi-tracking", action="store_true",
+                        help="detect on a crop around the last hand instead of the whole frame")
+    parser.add_argument("--mouse-backend", choices=["pyautogui", "uinput"], default="pyautogui",
+                        help="how cursor and clicks are injected")
+    parser.add_argument("--decode-scale", type=int, choices=[1, 2, 4, 8], default=1,
+                        help="decode MJPEG at 1/N size while the preview is hidden")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a preview window; type keys on stdin, one per line")
+    parser.add_argument("--record-landmarks", metavar="PATH",
+                        help="record every frame's landmarks here for landmark_recording.py")
+    parser.add_argument("--publish-landmarks", nargs="?", const="mediwave-landmarks",
+                        metavar="NAME", help="publish landmarks to a shared-memory ring "
+                                             "for landmark_ring.LandmarkReader clients")
+    parser.add_argument("--idle-after", type=float, default=10.0,
+                        help="seconds without a hand before dropping to the idle profile "
+                             "(0 disables motion gating)")
+    parser.add_argument("--detector-backend", choices=["solutions", "tasks"], default="solutions",
+                        help="MediaPipe API: blocking solutions Hands or asynchronous Tasks "
+                             "HandLandmarker (needs hand_landmarker.task; not with "
+                             "--inference-workers or --roi-tracking)")
+    parser.add_argument("--frame-budget", type=float, default=0.25,
+                        help="drop frames older than this many seconds before inference "
+                             "or actuation (0 = never)")
+    parser.add_argument("--calibration", metavar="PATH",
+                        help="active-region calibration file "
+                             "(default ~/.config/mediwave/calibration.json); 'c' records one")
+    parser.add_argument("--edge-gain", type=float, default=0.5,
+                        help="edge acceleration for new calibrations (0 = plain homography)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="performance profile written by tune.py "
+                             "(default ~/.config/mediwave/profile.json)")
+    parser.add_argument("--metrics", metavar="ADDR",
+                        help="serve Prometheus metrics on a local port, host:port or unix:PATH")
+    parser.add_argument("--startup-budget", type=float, default=3.0,
+                        help="target seconds from launch to the first cursor move")
+    args = parser.parse_args()
+
+    startup = StartupTimer(origin=STARTED, budget=args.startup_budget)
+    HandTrackingApp = startup.run("import", _import_app)
+    app = HandTrackingApp(trace_dump=args.trace_dump, inference_workers=args.inference_workers,
+                          roi_tracking=args.roi_tracking, mouse_backend=args.mouse_backend,
+                          decode_scale=args.decode_scale, headless=args.headless,
+                          record_landmarks=args.record_landmarks, idle_after=args.idle_after,
+                          detector_backend=args.detector_backend,
+                          frame_budget=args.frame_budget, calibration_path=args.calibration,
+                          edge_gain=args.edge_gain,
+                          publish_landmarks=args.publish_landmarks,
+                          profile=load_profile(args.profile), metrics=args.metrics,
+                          startup=startup)
     app.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,235 @@
+"""
+Local metrics endpoint in the Prometheus text exposition format.
+
+The frame loop only bumps plain integer counters it already keeps (and a
+few new ones, each written by a single thread), so there is no lock or
+extra work per frame. Everything else is read when the endpoint is
+scraped, plus a sampler thread that turns the counters into per-second
+rates once every interval seconds:
+
+    python3 main.py --metrics 9464              # http://127.0.0.1:9464/metrics
+    python3 main.py --metrics unix:/run/mediwave.sock
+    curl --unix-socket /run/mediwave.sock http://localhost/metrics
+
+Thread CPU time and resident memory come from /proc, so they are only
+reported on Linux.
+"""
+
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "mediwave_"
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _thread_cpu_seconds():
+    """Thread name -> user+system CPU seconds, threads of the same name summed."""
+    names = {t.native_id: t.name for t in threading.enumerate()}
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu = {}
+    for tid in os.listdir("/proc/self/task"):
+        try:
+            with open(f"/proc/self/task/{tid}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue  # Thread exited
+        # comm is in parentheses and may contain spaces; fields follow the last ")"
+        comm = stat[stat.index("(") + 1:stat.rindex(")")]
+        fields = stat[stat.rindex(")") + 2:].split()
+        name = names.get(int(tid), comm)  # Native threads (MediaPipe, OpenCV) by comm
+        cpu[name] = cpu.get(name, 0.0) + (int(fields[11]) + int(fields[12])) / ticks
+    return cpu
+
+
+def _resident_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class MetricsServer:
+    """Serves a HandTrackingApp's counters and gauges at /metrics.
+
+    address is a port or "host:port" for HTTP over TCP (host defaults to
+    127.0.0.1, so the endpoint is local only) or "unix:PATH" for a Unix
+    socket.
+    """
+
+    def __init__(self, app, address="9464", interval=1.0):
+        self.app = app
+        self.interval = interval
+        self.rates = {}  # Gauge name -> value from the sampler
+        self.last_sample = None
+        self.running = False
+        handler = type("Handler", (_MetricsHandler,), {"metrics": self})
+        if str(address).startswith("unix:"):
+            self.path = address[len("unix:"):]
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self.server = _UnixHTTPServer(self.path, handler)
+            self.address = address
+        else:
+            host, _, port = str(address).rpartition(":")
+            self.path = None
+            self.server = _TCPHTTPServer((host or "127.0.0.1", int(port)), handler)
+            self.address = f"http://{host or '127.0.0.1'}:{self.server.server_address[1]}/metrics"
+        self.threads = [threading.Thread(target=self.server.serve_forever, name="metrics-http",
+                                         daemon=True),
+                        threading.Thread(target=self._sample_loop, name="metrics-sampler",
+                                         daemon=True)]
+
+    def start(self):
+        self.running = True
+        for thread in self.threads:
+            thread.start()
+
+    def close(self):
+        self.running = False
+        self.server.shutdown()
+        self.server.server_close()
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _counters(self):
+        app = self.app
+        return (time.monotonic(), app.captured_frames, self._inferences(), app.frame_count,
+                app.hand_frames)
+
+    def _inferences(self):
+        reasons = self.app.scheduler.stats()["reasons"]
+        return reasons.get("motion", 0) + reasons.get("search", 0) + reasons.get("forced", 0)
+
+    def _sample_loop(self):
+        while self.running:
+            sample = self._counters()
+            if self.last_sample is not None:
+                t0, captured0, inferred0, handled0, hands0 = self.last_sample
+                t1, captured1, inferred1, handled1, hands1 = sample
+                dt = t1 - t0
+                if dt > 0:
+                    handled = handled1 - handled0
+                    self.rates = {
+                        "capture_fps": (captured1 - captured0) / dt,
+                        "inference_fps": (inferred1 - inferred0) / dt,
+                        "handled_fps": handled / dt,
+                        "hand_detection_ratio": (hands1 - hands0) / handled if handled else 0.0,
+                    }
+            self.last_sample = sample
+            time.sleep(self.interval)
+
+    def collect(self):
+        """(name, type, help, [(labels dict, value)]) for every metric."""
+        app = self.app
+        mouse = app.mouse
+        injector = mouse.injector.stats()
+        scheduler = app.scheduler.stats()
+        with app.drops_lock:
+            drops = dict(app.drops)
+        with mouse.lock:
+            # The main loop adds keys to these
+            errors = dict(mouse.errors)
+            gesture_events = dict(mouse.gesture_events)
+        metrics = [
+            ("frames_captured_total", "counter", "Frames read from the camera",
+             [({}, app.captured_frames)]),
+            ("inferences_total", "counter", "Hand detections run",
+             [({}, self._inferences())]),
+            ("frames_handled_total", "counter", "Frames that reached the main loop's output",
+             [({}, app.frame_count)]),
+            ("frames_with_hand_total", "counter", "Handled frames with at least one hand",
+             [({}, app.hand_frames)]),
+            ("frames_dropped_total", "counter", "Frames dropped before use, by reason",
+             [({"reason": reason}, count) for reason, count in sorted(drops.items())]),
+            ("mailbox_depth", "gauge", "Items waiting in a frame mailbox (0 or 1)",
+             [({"mailbox": name}, int(box.item is not None))
+              for name, box in (("frames", app.frames), ("processed", app.processed))]),
+            ("mailbox_replaced_total", "counter", "Items replaced before they were taken",
+             [({"mailbox": name}, box.replaced)
+              for name, box in (("frames", app.frames), ("processed", app.processed))]),
+            ("frame_pool_in_use", "gauge", "Frame buffers currently held",
+             [({}, app.frame_pool.in_use())]),
+            ("frame_pool_exhausted_total", "counter", "Frame buffer requests that found none free",
+             [({}, app.frame_pool.exhausted)]),
+            ("injector_queue_depth", "gauge", "Input intents waiting to be injected",
+             [({}, injector["depth"])]),
+            ("input_injected_total", "counter", "Input events injected",
+             [({}, injector["injected"])]),
+            ("input_coalesced_total", "counter", "Cursor moves merged into a newer one",
+             [({}, injector["coalesced"])]),
+            ("input_injection_errors_total", "counter", "Input events that raised",
+             [({}, injector["errors"])]),
+            ("mouse_errors_total", "counter", "Exceptions caught in MouseController, by handler",
+             [({"where": where}, count) for where, count in sorted(errors.items())]),
+            ("gesture_events_total", "counter", "Gesture engine events",
+             [({"gesture": name, "event": event}, count)
+              for (name, event), count in sorted(gesture_events.items())]),
+            ("inference_latency_seconds", "gauge", "Scheduler's running inference time estimate",
+             [({}, scheduler["inference_ms"] / 1000.0)]),
+            ("process_cpu_seconds_total", "counter", "CPU time of the whole process",
+             [({}, time.process_time())]),
+        ]
+        for name, help_text in (("capture_fps", "Camera frames per second"),
+                                ("inference_fps", "Hand detections per second"),
+                                ("handled_fps", "Handled frames per second"),
+                                ("hand_detection_ratio", "Share of handled frames with a hand")):
+            if name in self.rates:
+                metrics.append((name, "gauge", help_text, [({}, self.rates[name])]))
+        if app.gate is not None:
+            metrics.append(("idle", "gauge", "1 while the idle power profile is active",
+                            [({}, int(app.gate.idle))]))
+        if os.path.isdir("/proc/self/task"):
+            metrics.append(("thread_cpu_seconds_total", "counter", "CPU time per thread",
+                            [({"thread": name}, seconds)
+                             for name, seconds in sorted(_thread_cpu_seconds().items())]))
+            metrics.append(("resident_memory_bytes", "gauge", "Resident set size",
+                            [({}, _resident_bytes())]))
+        return metrics
+
+    def render(self):
+        """The metrics in Prometheus text exposition format."""
+        lines = []
+        for name, kind, help_text, samples in self.collect():
+            name = PREFIX + name
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics = None  # Set on the per-server subclass
+    timeout = 5.0  # A stalled client must not hold up the next scrape
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # One line per scrape would drown the app's own log
+
+
+# Scrapes are served one at a time on the metrics-http thread: a thread per
+# request would show up as a new thread_cpu_seconds_total series every scrape
+class _TCPHTTPServer(socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+class _UnixHTTPServer(socketserver.UnixStreamServer):
+    def get_request(self):
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        request, _ = super().get_request()
+        return request, ("local", 0)
@@ -0,0 +1,118 @@
+import threading
+import time
+import cv2
+import numpy as np
+
+class MotionGate:
+    """Cheap motion check in front of hand detection, plus the idle power profile.
+
+    Every frame is shrunk to a tiny grayscale thumbnail and compared with
+    the previous one. Detection is allowed while a hand is present, when
+    the thumbnail changed by more than threshold (mean absolute difference,
+    0-255), and once every heartbeat seconds so a hand that slid in very
+    slowly is still found. A static, empty scene therefore costs one
+    thumbnail per frame instead of one inference.
+
+    After idle_after seconds without a hand the gate goes idle: the app
+    then captures at idle_fps and stops the cursor thread from spinning.
+    The first frame with motion makes it active again. Wall and process
+    CPU time are accumulated per state for stats().
+    """
+
+    STATES = ("active", "idle")
+
+    def __init__(self, size=(32, 24), threshold=3.0, idle_after=10.0, heartbeat=1.0,
+                 idle_fps=5):
+        self.size = size
+        self.threshold = threshold
+        self.idle_after = idle_after
+        self.heartbeat = heartbeat
+        self.idle_period = 1.0 / idle_fps
+        self.lock = threading.Lock()
+        self.small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self.gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        self.previous = None
+        self.motion = 0.0  # Last mean absolute difference
+        self.hand_present = False
+        self.unknown = False  # Last detection gave no answer yet (e.g. asynchronous backend)
+        self.last_activity = time.monotonic()  # Last hand or wake-up
+        self.last_pass = 0.0
+        self.idle = False
+        self.passed = 0
+        self.blocked = 0
+        self.wakeups = 0
+        self.usage = {state: [0.0, 0.0] for state in self.STATES}  # [wall, cpu] seconds
+        self.usage_mark = (time.monotonic(), time.process_time())
+
+    def allow(self, frame, now=None):
+        """Return True if hand detection should run on frame."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.gray)
+            if self.previous is None:
+                self.previous = self.gray.copy()
+                moved = True
+            else:
+                self.motion = float(cv2.absdiff(self.gray, self.previous).mean())
+                self.previous, self.gray = self.gray, self.previous
+                moved = self.motion > self.threshold
+
+            self._account()
+            if moved:
+                if self.idle:
+                    self.wakeups += 1
+                    self.idle = False
+                self.last_activity = now
+            elif not self.hand_present and now - self.last_activity > self.idle_after:
+                self.idle = True
+
+            run = (self.hand_present or self.unknown or moved
+                   or now - self.last_pass >= self.heartbeat)
+            if run:
+                self.last_pass = now
+                self.passed += 1
+            else:
+                self.blocked += 1
+            return run
+
+    def observe(self, results, now=None):
+        """Feed back whether the last detection found a hand; None means no answer yet."""
+        now = time.monotonic() if now is None else now
+        landmarks = getattr(results, "landmarks", None)
+        with self.lock:
+            self.unknown = results is None
+            if self.unknown:
+                return
+            self.hand_present = landmarks is not None and len(landmarks) > 0
+            if self.hand_present:
+                self.last_activity = now
+                self.idle = False
+
+    def _account(self):
+        wall, cpu = time.monotonic(), time.process_time()
+        usage = self.usage["idle" if self.idle else "active"]
+        usage[0] += wall - self.usage_mark[0]
+        usage[1] += cpu - self.usage_mark[1]
+        self.usage_mark = (wall, cpu)
+
+    def stats(self):
+        """Gate counters and CPU use (percent of one core) per state."""
+        with self.lock:
+            self._account()
+            return {
+                "state": "idle" if self.idle else "active",
+                "passed": self.passed,
+                "blocked": self.blocked,
+                "wakeups": self.wakeups,
+                "motion": round(self.motion, 2),
+                **{f"{state}_s": round(wall, 1) for state, (wall, _) in self.usage.items()},
+                **{f"{state}_cpu_pct": round(cpu / wall * 100, 1) if wall > 0 else None
+                   for state, (wall, cpu) in self.usage.items()},
+            }
+
+    def log_line(self):
+        s = self.stats()
+        return (f"[MotionGate] state={s['state']} passed={s['passed']} blocked={s['blocked']} "
+                f"wakeups={s['wakeups']} cpu active/idle={s['active_cpu_pct']}/"
+                f"{s['idle_cpu_pct']}% over {s['active_s']}/{s['idle_s']}s")
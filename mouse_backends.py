@@ -0,0 +1,98 @@
+class PyAutoGuiBackend:
+    """Input injection through pyautogui (X11)."""
+
+    def __init__(self):
+        # Imported here so other backends work without an X display
+        import pyautogui
+        self.pyautogui = pyautogui
+        # Calls now run on the injector thread; the per-call sleep only adds latency
+        pyautogui.PAUSE = 0
+
+    def screen_size(self):
+        return self.pyautogui.size()
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def mouse_down(self):
+        self.pyautogui.mouseDown()
+
+    def mouse_up(self):
+        self.pyautogui.mouseUp()
+
+    def click(self):
+        self.pyautogui.click()
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+    def type_text(self, text):
+        self.pyautogui.write(text)
+
+    def close(self):
+        pass
+
+
+class UinputBackend:
+    """Input injection through libclicker's uinput devices (X11 and Wayland).
+
+    The cursor is an absolute-axis pointer, so every move is one atomic
+    ABS_X/ABS_Y event frame with no relative "reset to corner" jump.
+    The devices are created when the backend is built, so the uinput
+    settle delay overlaps the rest of startup.
+    """
+
+    def __init__(self, screen_w=None, screen_h=None):
+        # Imported here: needs python-uinput and write access to /dev/uinput
+        import libclicker
+        self.clicker = libclicker
+        if screen_w is None or screen_h is None:
+            screen_w, screen_h = self._detect_screen_size()
+        self.size = (screen_w, screen_h)
+        libclicker.set_screen_size(screen_w, screen_h)
+        # Create and settle the devices now, during startup, not on the first move
+        libclicker.init()
+
+    @staticmethod
+    def _detect_screen_size():
+        """Framebuffer size from sysfs; works without a display server connection."""
+        try:
+            with open("/sys/class/graphics/fb0/virtual_size") as f:
+                w, h = f.read().strip().split(",")
+            return int(w), int(h)
+        except (OSError, ValueError):
+            return 1920, 1080
+
+    def screen_size(self):
+        return self.size
+
+    def move_to(self, x, y):
+        self.clicker.move_mouse(int(x), int(y))
+
+    def mouse_down(self):
+        self.clicker.press_button(0)
+
+    def mouse_up(self):
+        self.clicker.release_button(0)
+
+    def click(self):
+        self.clicker.press_button(0)
+        self.clicker.release_button(0)
+
+    def hotkey(self, *keys):
+        self.clicker.hotkey(*keys)
+
+    def type_text(self, text):
+        self.clicker.type_text(text)
+
+    def close(self):
+        pass
+
+
+BACKENDS = {"pyautogui": PyAutoGuiBackend, "uinput": UinputBackend}
+
+def create_backend(name):
+    """Create an input backend by name ("pyautogui" or "uinput")."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown mouse backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
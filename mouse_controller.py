@@ -1,21 +1,60 @@
+import collections
+import functools
+import threading
 import time
 import numpy as np
-import pyautogui
+from gesture_engine import GestureEngine, MOUSE_GESTURES
+from input_injector import InputInjector
+from mouse_backends import PyAutoGuiBackend
+
+def _serialized(method):
+    """Run method under the controller's lock; the cursor thread and main loop both inject."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class MouseController:
-    def __init__(self, smoothing_factor=0.8, screen_w=None, screen_h=None):
-        """Initialize mouse controller with optional screen dimensions."""
+    def __init__(self, smoothing_factor=0.8, screen_w=None, screen_h=None, backend=None,
+                 mapping=None):
+        """Initialize mouse controller with optional screen dimensions.
+
+        All injection goes through an InputInjector thread on backend
+        (pyautogui by default), so no method here blocks on the OS.
+        mapping, a calibration.ScreenMapping, maps the calibrated active
+        region to the screen; without one the whole camera view is used.
+        """
         self.debug_prefix = "[MouseController]"
+        self.mapping = mapping
+        self.lock = threading.RLock()
+        self.backend = backend if backend is not None else PyAutoGuiBackend()
+        self.injector = InputInjector(self.backend)
         self.hand_lost_threshold = 0.2  # seconds to wait before considering hand truly lost
-        self.last_hand_detected_time = time.time()
+        self.last_hand_detected_time = time.monotonic()
         
         # Zoom gesture cooldown to prevent rapid triggers
         self.zoom_cooldown = 0.5  # seconds
         self.last_zoom_time = 0
+
+        # Gesture events -> actions; the engine decides when each event fires
+        self.gestures = GestureEngine(MOUSE_GESTURES)
+        self.gesture_events = collections.Counter()  # (name, event) -> count, for metrics
+        self.errors = collections.Counter()  # Handler -> exceptions caught there
+        self.gesture_actions = {
+            ("pinch", "start"): self._press,
+            ("pinch", "end"): self._release,
+            ("drag", "start"): self._start_drag,
+            ("drag", "end"): self._end_drag,
+            ("zoom_in", "start"): functools.partial(self._zoom, ("ctrl", "+")),
+            ("zoom_in", "repeat"): functools.partial(self._zoom, ("ctrl", "+")),
+            ("zoom_out", "start"): functools.partial(self._zoom, ("ctrl", "-")),
+            ("zoom_out", "repeat"): functools.partial(self._zoom, ("ctrl", "-")),
+        }
         try:
-            # Get screen resolution from pyautogui if not provided
+            # Get screen resolution from the backend if not provided
             if screen_w is None or screen_h is None:
-                screen_w, screen_h = pyautogui.size()
+                screen_w, screen_h = self.backend.screen_size()
                 print(f"Screen resolution detected: {screen_w}x{screen_h}")
             
             self.screen_w = screen_w
@@ -24,18 +63,21 @@ class MouseController:
             self.last_x = screen_w // 2  # Start at screen center
             self.last_y = screen_h // 2
             self.is_dragging = False
-            self.pinch_start_time = None
             self.is_mouse_down = False
             
             # Move to center initially
-            pyautogui.moveTo(self.last_x, self.last_y)
+            self.injector.push("move_to", self.last_x, self.last_y)
             
         except Exception as e:
+            self.errors["init"] += 1
             print(f"Error initializing mouse control: {str(e)}")
             self.screen_w = 1920
             self.screen_h = 1080
+            self.smoothing_factor = smoothing_factor
             self.last_x = 960
             self.last_y = 540
+            self.is_dragging = False
+            self.is_mouse_down = False
     
     def smooth_position(self, x, y):
         """Apply smoothing to reduce jitter. Higher smoothing_factor = more responsive."""
@@ -52,12 +94,16 @@ class MouseController:
             
             return int(smoothed_x), int(smoothed_y)
         except Exception as e:
+            self.errors["smooth_position"] += 1
             print(f"Error in smooth_position: {str(e)}")
             return self.last_x, self.last_y
     
     def map_coordinates(self, x, y, input_w, input_h):
         """Map input coordinates to screen coordinates."""
         try:
+            if self.mapping is not None:
+                # Calibrated region, precomputed lookup table
+                x, y = self.mapping.map(x, y)
             # Map to screen coordinates directly
             screen_x = x * self.screen_w
             screen_y = y * self.screen_h
@@ -68,9 +114,11 @@ class MouseController:
             
             return screen_x, screen_y
         except Exception as e:
+            self.errors["map_coordinates"] += 1
             print(f"Error in map_coordinates: {str(e)}")
             return self.last_x, self.last_y
     
+    @_serialized
     def move_mouse(self, x, y):
         """Move mouse to specified coordinates."""
         try:
@@ -78,79 +126,108 @@ class MouseController:
             y = int(y)
             if 0 <= x < self.screen_w and 0 <= y < self.screen_h:
                 if abs(x - self.last_x) > 0 or abs(y - self.last_y) > 0:
-                    pyautogui.moveTo(x, y)
+                    self.injector.push("move_to", x, y)
                     self.last_x = x
                     self.last_y = y
         except Exception as e:
+            self.errors["move_mouse"] += 1
             print(f"Error moving mouse: {str(e)}")
     
-    def handle_pinch(self, is_pinched):
-        """Handle pinch gesture for mouse clicks and dragging."""
-        try:
-            current_time = time.time()
-            self.last_hand_detected_time = current_time  # Update last hand detection time
-            
-            if is_pinched:
-                if not self.is_dragging:
-                    if self.pinch_start_time is None:
-                        # Start timing the pinch
-                        self.pinch_start_time = current_time
-                        if not self.is_mouse_down:
-                            pyautogui.mouseDown()
-                            self.is_mouse_down = True
-                    elif current_time - self.pinch_start_time >= 0.5:
-                        # Convert to drag after 0.5s
-                        self.is_dragging = True
-            else:
-                if self.pinch_start_time is not None:
-                    if not self.is_dragging:
-                        # Quick pinch and release = click
-                        if self.is_mouse_down:
-                            pyautogui.mouseUp()
-                            pyautogui.click()
-                            self.is_mouse_down = False
-                    else:
-                        # End dragging
-                        if self.is_mouse_down:
-                            pyautogui.mouseUp()
-                            self.is_mouse_down = False
-                        self.is_dragging = False
-                    self.pinch_start_time = None
-        except Exception as e:
-            print(f"Error in handle_pinch: {str(e)}")
-            self.disable_control()
-    
-    def handle_zoom(self, is_zoom_in, is_zoom_out):
-        """Handle zoom in/out gestures."""
-        try:
-            current_time = time.time()
-            self.last_hand_detected_time = current_time
-            
-            # Check cooldown to prevent rapid zooming
-            if current_time - self.last_zoom_time < self.zoom_cooldown:
-                return
-                
-            if is_zoom_in:
-                pyautogui.hotkey('ctrl', '+')
-                self.last_zoom_time = current_time
-            elif is_zoom_out:
-                pyautogui.hotkey('ctrl', '-')
-                self.last_zoom_time = current_time
-                
-        except Exception as e:
-            print(f"Error in handle_zoom: {str(e)}")
-    
-    def disable_control(self):
+    @_serialized
+    def handle_gestures(self, events, now=None):
+        """Apply (name, event, held) gesture events through gesture_actions."""
+        current_time = time.monotonic() if now is None else now
+        self.last_hand_detected_time = current_time  # Update last hand detection time
+        for name, event, held in events:
+            self.gesture_events[name, event] += 1
+            action = self.gesture_actions.get((name, event))
+            if action is None:
+                continue
+            try:
+                action(current_time)
+            except Exception as e:
+                self.errors["gesture"] += 1
+                print(f"Error in gesture {name} {event}: {str(e)}")
+                self.disable_control()
+
+    def _press(self, now):
+        if not self.is_mouse_down:
+            self.injector.push("mouse_down")
+            self.is_mouse_down = True
+
+    def _release(self, now):
+        if self.is_mouse_down:
+            self.injector.push("mouse_up")
+            if not self.is_dragging:
+                # Quick pinch and release = click
+                self.injector.push("click")
+            self.is_mouse_down = False
+
+    def _start_drag(self, now):
+        self.is_dragging = True
+
+    def _end_drag(self, now):
+        self.is_dragging = False
+
+    def _zoom(self, keys, now):
+        # Check cooldown to prevent rapid zooming
+        if now - self.last_zoom_time >= self.zoom_cooldown:
+            self.injector.push("hotkey", *keys)
+            self.last_zoom_time = now
+
+    @_serialized
+    def disable_control(self, now=None):
         """Reset control state when hand is not detected."""
         try:
-            current_time = time.time()
+            current_time = time.monotonic() if now is None else now
             # Only reset states if hand has been lost for longer than threshold
             if current_time - self.last_hand_detected_time > self.hand_lost_threshold:
                 if self.is_mouse_down:
-                    pyautogui.mouseUp()
+                    self.injector.push("mouse_up")
                     self.is_mouse_down = False
-                if self.is_dragging:
-                    self.is_dragging = False
-                    self.pinch_start_time = None
+                self.is_dragging = False
+                self.gestures.reset()
         except Exception as e:
+            self.errors["disable_control"] += 1
             print(f"Error in disable_control: {str(e)}")
+
+    def follow_hand(self, detector, results, frame_w, frame_h, cursor=None, now=None):
+        """Drive the cursor and gestures from one frame's detection results.
+
+        The right index fingertip is mapped to the screen and either fed to
+        cursor (a PredictiveCursor, at results.timestamp) or smoothed and
+        moved to inline; then the hand is run through the gesture engine. now overrides the
+        clock used for gesture timing, e.g. when replaying a recording.
+        Returns the fingertip's normalized (x, y), or None without a right hand.
+        """
+        right_hand = detector.find_right_hand(results)
+        if not right_hand:
+            self.disable_control(now)
+            return None
+        finger_pos = detector.get_index_finger_pos(right_hand)
+        if not finger_pos:
+            return None
+        x, y = finger_pos
+
+        # Move mouse cursor
+        screen_x, screen_y = self.map_coordinates(x, y, frame_w, frame_h)
+        if cursor is not None:
+            # The cursor thread interpolates from here; reused
+            # results carry their original detection time
+            cursor.update(screen_x, screen_y, results.timestamp)
+        else:
+            smooth_x, smooth_y = self.smooth_position(screen_x, screen_y)
+            self.move_mouse(smooth_x, smooth_y)
+
+        # Pinch (click/drag) and zoom gestures
+        now = time.monotonic() if now is None else now
+        self.handle_gestures(self.gestures.update(right_hand, now), now)
+        return finger_pos
+
+    def close(self):
+        """Release any held button, flush pending input and release the backend."""
+        if self.is_mouse_down:
+            self.injector.push("mouse_up")
+            self.is_mouse_down = False
+        self.injector.close()
+        self.backend.close()
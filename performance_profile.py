@@ -0,0 +1,69 @@
+"""
+Per-machine performance profile: the capture, detection and cursor
+settings that differ between hardware generations.
+
+tune.py measures candidate values on the target machine and saves the
+best set with save_profile(); main.py loads it with load_profile() at
+startup and HandTrackingApp applies it. Keys missing from the file keep
+their PROFILE_DEFAULTS value.
+"""
+
+import json
+import os
+import platform
+import time
+from user_config import config_path
+
+PROFILE_DEFAULTS = {
+    "camera_width": 640,
+    "camera_height": 480,
+    "camera_fps": 24,
+    "process_size": (160, 120),  # Detection input resolution
+    "target_latency": 0.1,  # InferenceScheduler target, seconds
+    "min_detection_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
+    "smoothing_factor": 0.7,  # Inline cursor smoothing (cursor_rate 0)
+}
+
+def default_path():
+    """Per-installation profile file."""
+    return config_path("profile.json")
+
+
+def load_profile(path=None):
+    """PROFILE_DEFAULTS updated with the saved profile, if there is one."""
+    profile = dict(PROFILE_DEFAULTS)
+    path = path or default_path()
+    try:
+        with open(path) as f:
+            saved = json.load(f)["profile"]
+    except FileNotFoundError:
+        return profile
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        print(f"Ignoring unreadable profile {path} ({e}); using the defaults")
+        return profile
+    unknown = set(saved) - set(PROFILE_DEFAULTS)
+    if unknown:
+        print(f"Ignoring unknown profile settings in {path}: {', '.join(sorted(unknown))}")
+    for key in PROFILE_DEFAULTS.keys() & saved.keys():
+        value = saved[key]
+        profile[key] = tuple(value) if isinstance(PROFILE_DEFAULTS[key], tuple) else value
+    return profile
+
+
+def save_profile(profile, path=None, measurements=None):
+    """Write profile (plus how it was measured) and return the path."""
+    path = path or default_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = {
+        "profile": {key: profile[key] for key in PROFILE_DEFAULTS},
+        "host": {"node": platform.node(), "machine": platform.machine(),
+                 "processor": platform.processor(), "cpus": os.cpu_count()},
+        "saved_at": time.time(),
+    }
+    if measurements is not None:
+        data["measurements"] = measurements
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    return path
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+from landmarks import LandmarkResults
+
+class RoiTracker:
+    """Landmark-guided region-of-interest cropping for hand detection.
+
+    While a hand is tracked, the next frame is cropped to a padded square
+    around the previous landmarks at native resolution and scaled to
+    roi_size x roi_size, so the hand fills the detector input instead of
+    covering a few dozen pixels of a whole-frame downscale. When tracking
+    is lost (or every redetect_interval frames while fewer than max_hands
+    are tracked) the whole frame is searched again.
+    """
+
+    def __init__(self, roi_size=128, padding=0.5, min_side=96,
+                 redetect_interval=30, max_hands=2):
+        self.roi_size = roi_size
+        self.padding = padding
+        self.min_side = min_side
+        self.redetect_interval = redetect_interval
+        self.max_hands = max_hands
+        self.roi = None  # (x0, y0, side) in full-frame pixels
+        self.frames_since_search = 0
+        self.tracked_frames = 0
+        self.full_searches = 0
+        self.lost_count = 0
+
+    def prepare(self, frame, full_buf, roi_buf):
+        """Return (detector input, roi) for frame, written into one of the buffers."""
+        roi = self.roi
+        if roi is None:
+            self.full_searches += 1
+            self.frames_since_search = 0
+            cv2.resize(frame, (full_buf.shape[1], full_buf.shape[0]), dst=full_buf)
+            return full_buf, None
+        x0, y0, side = roi
+        self.tracked_frames += 1
+        self.frames_since_search += 1
+        crop = frame[y0:y0 + side, x0:x0 + side]
+        cv2.resize(crop, (self.roi_size, self.roi_size), dst=roi_buf,
+                   interpolation=cv2.INTER_AREA)
+        return roi_buf, roi
+
+    def update(self, results, roi, frame_shape):
+        """Map results back to full-frame coordinates and choose the next ROI.
+
+        Always returns LandmarkResults (or None if detection failed).
+        """
+        if results is None:
+            self.roi = None
+            return None
+        results = LandmarkResults.from_mediapipe(results)
+        h, w = frame_shape[:2]
+        landmarks = results.landmarks
+        if roi is not None and len(landmarks):
+            x0, y0, side = roi
+            landmarks[..., 0] = (x0 + landmarks[..., 0] * side) / w
+            landmarks[..., 1] = (y0 + landmarks[..., 1] * side) / h
+            landmarks[..., 2] *= side / w
+
+        if len(landmarks) == 0:
+            if roi is not None:
+                self.lost_count += 1
+            self.roi = None
+        elif len(landmarks) < self.max_hands and self.frames_since_search >= self.redetect_interval:
+            # Look for hands that entered outside the current ROI
+            self.roi = None
+        else:
+            self.roi = self._roi_from_landmarks(landmarks, w, h)
+        return results
+
+    def _roi_from_landmarks(self, landmarks, w, h):
+        xs = landmarks[..., 0] * w
+        ys = landmarks[..., 1] * h
+        x_min, x_max = float(xs.min()), float(xs.max())
+        y_min, y_max = float(ys.min()), float(ys.max())
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.padding)
+        side = int(min(max(side, self.min_side), w, h))
+        cx = (x_min + x_max) / 2
+        cy = (y_min + y_max) / 2
+        x0 = int(np.clip(cx - side / 2, 0, w - side))
+        y0 = int(np.clip(cy - side / 2, 0, h - side))
+        return x0, y0, side
+
+    def reset(self):
+        """Forget the current ROI so the next frame is a full-frame search."""
+        self.roi = None
+
+    def stats(self):
+        """Detections on a crop vs the whole frame, and tracks lost."""
+        total = self.tracked_frames + self.full_searches
+        return {
+            "tracked_frames": self.tracked_frames,
+            "full_searches": self.full_searches,
+            "lost": self.lost_count,
+            "tracked_ratio": round(self.tracked_frames / total, 3) if total else 0.0,
+        }
+
+    def log_line(self):
+        s = self.stats()
+        return (f"[RoiTracker] tracked={s['tracked_frames']} full={s['full_searches']} "
+                f"lost={s['lost']} tracked_ratio={s['tracked_ratio']}")
@@ -0,0 +1,245 @@
+import json
+import threading
+import time
+
+class FrameTrace:
+    """Monotonic timestamps for one frame as it moves through the pipeline.
+
+    Each mark(stage) attributes the time since the previous mark to that
+    stage, so the stage durations of a finished frame add up to its total
+    capture-to-output latency plus the time spent waiting for the device.
+    """
+    __slots__ = ("start", "timestamp", "deadline", "marks")
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.timestamp = self.start  # Capture time, set by the "capture" mark
+        self.deadline = float("inf")  # Drop the frame if still unhandled after this
+        self.marks = []
+
+    def mark(self, stage):
+        now = time.monotonic()
+        self.marks.append((stage, now))
+        if stage == "capture":
+            self.timestamp = now
+        return now
+
+    def durations(self):
+        """Yield (stage, seconds) for every mark, in pipeline order."""
+        prev = self.start
+        for stage, t in self.marks:
+            yield stage, t - prev
+            prev = t
+
+
+class StageHistogram:
+    """Log-linear (HDR-style) latency histogram over a rolling time window.
+
+    Values are recorded in microseconds into buckets whose width grows with
+    magnitude, giving a fixed relative error of about 1/sub_buckets from
+    1 us to over a minute with a few hundred counters. Two windows are kept
+    and rotated every window_s seconds, so percentiles always reflect the
+    last window_s to 2*window_s seconds.
+    """
+
+    def __init__(self, sub_buckets=32, max_exponent=26, window_s=10.0):
+        self.sub_buckets = sub_buckets
+        self.sub_bits = sub_buckets.bit_length() - 1
+        self.size = sub_buckets * (max_exponent - self.sub_bits + 2)
+        self.window_s = window_s
+        self.current = [0] * self.size
+        self.previous = [0] * self.size
+        self.rotated_at = time.monotonic()
+        self.max_us = 0
+
+    def _index(self, us):
+        if us < self.sub_buckets:
+            return us
+        shift = us.bit_length() - self.sub_bits - 1
+        index = (shift + 1) * self.sub_buckets + (us >> shift) - self.sub_buckets
+        return min(index, self.size - 1)
+
+    def _value(self, index):
+        """Upper edge, in microseconds, of the given bucket."""
+        if index < self.sub_buckets:
+            return index
+        shift = index // self.sub_buckets - 1
+        return ((index % self.sub_buckets + self.sub_buckets + 1) << shift) - 1
+
+    def record(self, seconds, now):
+        if now - self.rotated_at > self.window_s:
+            self.previous = self.current
+            self.current = [0] * self.size
+            self.rotated_at = now
+            self.max_us = 0
+        us = int(seconds * 1e6)
+        if us < 0:
+            us = 0
+        self.current[self._index(us)] += 1
+        if us > self.max_us:
+            self.max_us = us
+
+    def percentiles(self, ps=(50, 95, 99)):
+        """Return (count, {p: milliseconds}) over both windows."""
+        counts = [a + b for a, b in zip(self.current, self.previous)]
+        total = sum(counts)
+        result = {}
+        if total == 0:
+            return 0, result
+        targets = sorted(ps)
+        seen = 0
+        t = 0
+        for index, count in enumerate(counts):
+            seen += count
+            while t < len(targets) and seen >= total * targets[t] / 100.0:
+                result[targets[t]] = self._value(index) / 1000.0
+                t += 1
+            if t == len(targets):
+                break
+        return total, result
+
+
+class PipelineTracer:
+    """Per-stage latency histograms fed by FrameTrace objects.
+
+    Exposes the same summary three ways: overlay_lines() for the preview
+    window, maybe_log() for a periodic log line and dump() for a JSON file
+    that can be diffed between builds.
+    """
+
+    def __init__(self, log_interval=10.0, window_s=10.0, enabled=True):
+        self.enabled = enabled
+        self.log_interval = log_interval
+        self.window_s = window_s
+        self.histograms = {}
+        self.stage_order = []
+        self.lock = threading.Lock()
+        self.last_log = time.monotonic()
+
+    def start(self):
+        """Begin tracing a new frame."""
+        return FrameTrace()
+
+    def finish(self, trace):
+        """Record all stage durations of a frame that reached the output."""
+        if not self.enabled or trace is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            for stage, seconds in trace.durations():
+                self._histogram(stage).record(seconds, now)
+            # Total is capture-to-output; time blocked waiting for the device is excluded
+            self._histogram("total").record(now - trace.timestamp, now)
+
+    def _histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = StageHistogram(window_s=self.window_s)
+            self.histograms[stage] = histogram
+            self.stage_order.append(stage)
+        return histogram
+
+    def summary(self):
+        """Return {stage: {"count", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}."""
+        with self.lock:
+            stages = [(s, self.histograms[s]) for s in self.stage_order]
+            result = {}
+            for stage, histogram in stages:
+                count, ps = histogram.percentiles()
+                if count == 0:
+                    continue
+                result[stage] = {
+                    "count": count,
+                    "p50_ms": round(ps[50], 3),
+                    "p95_ms": round(ps[95], 3),
+                    "p99_ms": round(ps[99], 3),
+                    "max_ms": round(histogram.max_us / 1000.0, 3),
+                }
+        return result
+
+    def overlay_lines(self):
+        """Short per-stage lines for drawing on the preview frame."""
+        return [f"{stage}: {s['p50_ms']:.1f}/{s['p95_ms']:.1f}/{s['p99_ms']:.1f} ms"
+                for stage, s in self.summary().items()]
+
+    def log_line(self):
+        """One-line p50/p95 summary of every stage."""
+        parts = [f"{stage}={s['p50_ms']:.1f}/{s['p95_ms']:.1f}"
+                 for stage, s in self.summary().items()]
+        return "[Trace] p50/p95 ms " + " ".join(parts)
+
+    def maybe_log(self):
+        """Print the log line if log_interval seconds have passed; return True if printed."""
+        if not self.enabled or not self.log_interval:
+            return False
+        now = time.monotonic()
+        if now - self.last_log >= self.log_interval:
+            self.last_log = now
+            print(self.log_line())
+            return True
+        return False
+
+    def dump(self, path):
+        """Write the current summary as stable, diff-friendly JSON."""
+        with open(path, "w") as f:
+            json.dump({"window_s": self.window_s, "stages": self.summary()},
+                      f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+class StartupTimer:
+    """Wall-clock start and end of each startup phase, from process start.
+
+    Phases may run concurrently on different threads; report() lists them
+    in start order so overlap is visible, followed by one-off marks such
+    as the first captured frame and the first cursor command. budget is
+    the target time to first cursor command, in seconds.
+    """
+
+    def __init__(self, origin=None, budget=None):
+        self.origin = time.monotonic() if origin is None else origin
+        self.budget = budget
+        self.phases = {}  # name -> (start, end), seconds since origin
+        self.marks = {}  # name -> seconds since origin
+        self.lock = threading.Lock()
+
+    def run(self, name, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) as phase name and return its result."""
+        start = time.monotonic() - self.origin
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            end = time.monotonic() - self.origin
+            with self.lock:
+                self.phases[name] = (start, end)
+
+    def mark(self, name):
+        """Record the first time name happens; returns True only that first time."""
+        with self.lock:
+            if name in self.marks:
+                return False
+            self.marks[name] = time.monotonic() - self.origin
+            return True
+
+    def summary(self):
+        with self.lock:
+            result = {name: {"start_ms": round(start * 1000, 1),
+                             "duration_ms": round((end - start) * 1000, 1)}
+                      for name, (start, end) in sorted(self.phases.items(), key=lambda kv: kv[1])}
+            result.update({name: {"at_ms": round(t * 1000, 1)} for name, t in self.marks.items()})
+        return result
+
+    def report(self):
+        """Multi-line startup timing report."""
+        lines = ["[Startup] phase timings (ms since process start):"]
+        for name, stats in self.summary().items():
+            if "at_ms" in stats:
+                lines.append(f"  {name:>18}: at {stats['at_ms']}")
+            else:
+                lines.append(f"  {name:>18}: {stats['start_ms']} +{stats['duration_ms']}")
+        first = self.marks.get("first_cursor")
+        if self.budget is not None and first is not None:
+            verdict = "within" if first <= self.budget else "OVER"
+            lines.append(f"  first cursor {first * 1000:.0f}ms, {verdict} "
+                         f"{self.budget * 1000:.0f}ms budget")
+        return "\n".join(lines)
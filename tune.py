@@ -0,0 +1,107 @@
+"""
+Performance profile tuner for the machine it runs on.
+
+Runs the benchmark pipeline (benchmark.run_benchmark) with candidate
+settings and saves the best ones as the profile main.py loads at
+startup. The search is one setting at a time: each setting's candidates
+are tried with every other setting at its best value so far, which
+takes a few dozen short runs instead of the full grid.
+
+A run is scored by, in order: p95 frame-to-cursor latency within
+--max-p95, detection rate (share of frames on which the pointing hand
+was found), throughput, then lower p95. Use input with a hand in it:
+a recorded session or the live camera. Camera size and rate are only
+swept on a live camera; recorded input keeps its own.
+
+    python3 tune.py --source session.mp4
+    python3 tune.py --source /dev/video0 --duration 8 --max-p95 80
+"""
+
+import argparse
+import json
+import sys
+from benchmark import run_benchmark
+from performance_profile import PROFILE_DEFAULTS, default_path, load_profile, save_profile
+
+# Setting -> candidate values; camera settings only apply to a live source.
+# smoothing_factor is not swept: it only shapes the cursor path after a
+# command is issued, which none of the scores measure, so every candidate
+# would tie. It keeps its default or saved (--from-saved) value.
+CANDIDATES = {
+    "camera": [(640, 480, 30), (640, 480, 24), (320, 240, 30), (1280, 720, 30)],
+    "process_size": [(128, 96), (160, 120), (224, 168), (256, 192)],
+    "target_latency": [0.05, 0.1, 0.15],
+    "min_detection_confidence": [0.3, 0.5, 0.7],
+    "min_tracking_confidence": [0.3, 0.5, 0.7],
+}
+
+def _apply(profile, setting, value):
+    profile = dict(profile)
+    if setting == "camera":
+        profile["camera_width"], profile["camera_height"], profile["camera_fps"] = value
+    else:
+        profile[setting] = value
+    return profile
+
+
+def _score(report, max_p95):
+    p95 = report.get("latency_p95_ms", float("inf"))
+    return (p95 <= max_p95, round(report["detection_rate"], 2),
+            round(report["throughput_fps"]), -p95)
+
+
+def tune(source, duration=5.0, warmup=2.0, fps=30, max_p95=100.0, start=None, **app_kwargs):
+    """Search for the best profile on source; returns (profile, trials)."""
+    best = dict(start or PROFILE_DEFAULTS)
+    live = source is None or source.startswith("/dev/video")
+    trials = []
+    best_score = None
+    for setting, values in CANDIDATES.items():
+        if setting == "camera" and not live:
+            continue
+        for value in values:
+            candidate = _apply(best, setting, value)
+            report = run_benchmark(source, fps, duration, warmup, profile=candidate,
+                                   **app_kwargs)
+            score = _score(report, max_p95)
+            trials.append({"setting": setting, "value": value, "score": list(score),
+                           **{key: report.get(key) for key in (
+                               "throughput_fps", "detection_rate", "latency_p50_ms",
+                               "latency_p95_ms", "pipeline_drops")}})
+            print(f"{setting}={value}: {report['throughput_fps']} fps, detection "
+                  f"{report['detection_rate']}, p95 {report.get('latency_p95_ms')} ms")
+            if best_score is None or score > best_score:
+                best, best_score = candidate, score
+    return best, trials
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the performance profile for this machine")
+    parser.add_argument("--source", default="/dev/video0",
+                        help="/dev/videoN, a recorded video or an image path/glob with a hand in it")
+    parser.add_argument("--fps", type=float, default=30, help="input rate for recorded sources")
+    parser.add_argument("--duration", type=float, default=5, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds ignored per run")
+    parser.add_argument("--max-p95", type=float, default=100,
+                        help="p95 latency budget in ms; runs over it rank last")
+    parser.add_argument("--inference-workers", type=int, default=0)
+    parser.add_argument("--profile", metavar="PATH",
+                        help=f"where to write the profile (default {default_path()})")
+    parser.add_argument("--from-saved", action="store_true",
+                        help="start from the saved profile instead of the defaults")
+    parser.add_argument("--dry-run", action="store_true", help="report without saving")
+    args = parser.parse_args()
+
+    start = load_profile(args.profile) if args.from_saved else None
+    best, trials = tune(args.source, args.duration, args.warmup, args.fps, args.max_p95,
+                        start=start, inference_workers=args.inference_workers, idle_after=0)
+    print(json.dumps({key: best[key] for key in PROFILE_DEFAULTS}, indent=2))
+    if not args.dry_run:
+        path = save_profile(best, args.profile, measurements={
+            "source": args.source, "duration_s": args.duration, "max_p95_ms": args.max_p95,
+            "trials": trials})
+        print(f"Saved profile to {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+Location of mediwave's per-user files (calibration, performance profile).
+"""
+
+import os
+
+def config_path(filename):
+    """Path of filename in mediwave's directory under the user's config directory."""
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "mediwave", filename)